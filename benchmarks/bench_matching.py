@@ -0,0 +1,113 @@
+# benchmarks/bench_matching.py
+"""
+Microbenchmark del emparejamiento de ofertas (approve_bids) con 10k - 1M ofertas por paso.
+
+Compara:
+    - pandas:  la implementación anterior (DataFrame + sort_values + iterrows)
+    - dicts:   matching.match_bids sobre las ofertas en forma de diccionario (City)
+    - arrays:  matching.match_bid_arrays sobre arrays de NumPy (ArrayCity)
+
+Además de ofertas aleatorias, mide el peor caso de las rondas de match_bid_arrays: una
+cadena (b0, p0), (b1, p0), (b1, p1), (b2, p1), ... en la que cada ronda solo cerraría una oferta.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_matching.py --bids 10000 100000 1000000 --pandas-max 100000 --chain 10000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.final_project.matching import match_bid_arrays, match_bids
+
+
+class _Host:
+    def __init__(self, profits):
+        self.profits = profits
+
+
+def synthetic_bids(n_bids, seed=0):
+    """Genera n_bids ofertas aleatorias con ~4 ofertas por place y por comprador."""
+    rng = np.random.default_rng(seed)
+    n_agents = max(1, n_bids // 4)
+    place_ids = rng.integers(0, n_agents, n_bids)
+    buyer_ids = rng.integers(0, n_agents, n_bids)
+    budgets = rng.uniform(1e5, 1e6, n_agents)
+    bid_prices = budgets[buyer_ids]
+    # Precios redondeados para que haya empates en el spread
+    spreads = bid_prices - np.round(rng.uniform(5e4, 1e5, n_bids), -3)
+    return place_ids, buyer_ids, spreads, bid_prices, budgets
+
+
+def chain_bids(n_buyers):
+    """
+    Cadena de ~2 * n_buyers ofertas (b0, p0), (b1, p0), (b1, p1), (b2, p1), ... con spread
+    decreciente: el comprador k compite por p(k-1) con el anterior y por p(k) con el siguiente.
+    """
+    buyer_ids = np.repeat(np.arange(n_buyers), 2)[1:]
+    place_ids = np.repeat(np.arange(n_buyers), 2)[:-1]
+    spreads = np.arange(len(buyer_ids), 0, -1, dtype=np.float64)
+    budgets = np.full(n_buyers, 1e6)
+    bid_prices = budgets[buyer_ids]
+    return place_ids, buyer_ids, spreads, bid_prices, budgets
+
+
+def pandas_match(bids, hosts):
+    """Implementación anterior de City.approve_bids (solo para comparar)."""
+    df_bids = pd.DataFrame(bids).sort_values(by='spread', ascending=False)
+    approved, sold_places, buyers_who_bought = [], set(), set()
+    for _, bid in df_bids.iterrows():
+        if bid['place_id'] not in sold_places and bid['buyer_id'] not in buyers_who_bought:
+            buyer = hosts.get(bid['buyer_id'])
+            if buyer and buyer.profits >= bid['bid_price']:
+                approved.append(bid.to_dict())
+                sold_places.add(bid['place_id'])
+                buyers_who_bought.add(bid['buyer_id'])
+    return approved
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bids", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--pandas-max", type=int, default=100_000,
+                        help="No ejecutar la versión pandas por encima de este número de ofertas")
+    parser.add_argument("--chain", type=int, nargs="*", default=[10_000],
+                        help="Compradores de las cadenas de ofertas (peor caso de las rondas)")
+    args = parser.parse_args()
+
+    cases = [(f"{n_bids}", synthetic_bids(n_bids)) for n_bids in args.bids]
+    cases += [(f"cadena {n_buyers}", chain_bids(n_buyers)) for n_buyers in args.chain]
+
+    print(f"{'bids':>14} {'aprobadas':>10} {'pandas (s)':>11} {'dicts (s)':>10} {'arrays (s)':>11}")
+    for name, (place_ids, buyer_ids, spreads, bid_prices, budgets) in cases:
+        n_bids = len(place_ids)
+        bids = [{'place_id': p, 'seller_id': -1, 'buyer_id': b, 'spread': s, 'bid_price': bp}
+                for p, b, s, bp in zip(place_ids.tolist(), buyer_ids.tolist(), spreads.tolist(), bid_prices.tolist())]
+        hosts = {host_id: _Host(profits) for host_id, profits in enumerate(budgets.tolist())}
+
+        t_dicts, approved = timed(match_bids, bids, hosts)
+        t_arrays, approved_idx = timed(match_bid_arrays, place_ids, buyer_ids, spreads, bid_prices, budgets)
+        assert [(tx['place_id'], tx['buyer_id']) for tx in approved] == \
+            list(zip(place_ids[approved_idx].tolist(), buyer_ids[approved_idx].tolist()))
+
+        t_pandas = "-"
+        if n_bids <= args.pandas_max:
+            t_pandas = f"{timed(pandas_match, bids, hosts)[0]:.3f}"
+
+        print(f"{name:>14} {len(approved):>10} {t_pandas:>11} {t_dicts:>10.3f} {t_arrays:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/bench_memory.py
+"""
+Informe de memoria por agente del motor de objetos (City): bytes por Place, por Host y por celda.
+
+Dos medidas:
+    deep      -> tamaño de cada objeto y de lo que es solo suyo (historial, generador aleatorio,
+                 assets, frontera...), sin contar lo compartido (la ciudad, el índice de vecinos)
+    traced    -> memoria reservada (tracemalloc) por celda después de initialize y tras `steps` meses
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_memory.py --sizes 100 300 --steps 60
+    python benchmarks/bench_memory.py --baseline benchmarks/memory_baseline.json
+    python benchmarks/bench_memory.py --save-baseline benchmarks/memory_baseline.json
+
+Con --baseline, el informe muestra para cada medida el valor del baseline, el actual y el
+cambio. benchmarks/memory_baseline.json se midió con Place y Host sin __slots__ y con los
+assets en listas (el motor de objetos antes de compactarlos), con los valores por defecto.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.final_project.city import City
+
+AREA_RATES = {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)}
+SEED = 42
+
+# (clave del resultado, cabecera de la columna); {steps} se sustituye por el nº de meses
+COLUMNS = [('init_bytes_per_cell', 'init B/celda'), ('end_bytes_per_cell', 'mes {steps} B/celda'),
+           ('place_bytes', 'B/Place'), ('host_bytes', 'B/Host')]
+
+
+def deep_size(obj, shared):
+    """Bytes de `obj` y de todo lo que cuelga de él, sin entrar en los objetos de `shared`."""
+    seen = {id(o) for o in shared}
+    stack = [obj]
+    total = 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        # Los nombres de atributos y los enteros pequeños son objetos compartidos del intérprete
+        if isinstance(current, str) or (type(current) is int and -5 <= current <= 256):
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current)
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        if hasattr(current, '__dict__'):
+            stack.append(vars(current))
+        for cls in type(current).__mro__:
+            for slot in getattr(cls, '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def agent_sizes(city):
+    """Media de bytes (deep) por Place y por Host."""
+    shared = [city, city.neighbor_index]
+    places = sum(deep_size(place, shared) for place in city.places.values()) / len(city.places)
+    hosts = sum(deep_size(host, shared) for host in city.hosts.values()) / len(city.hosts)
+    return places, hosts
+
+
+def measure(size, steps):
+    """Devuelve un dict con los bytes por agente después de initialize y tras `steps` meses."""
+    gc.collect()
+    tracemalloc.start()
+    city = City(size, AREA_RATES, SEED)
+    city.initialize()
+    init_traced = tracemalloc.get_traced_memory()[0]
+    for _ in range(steps):
+        city.iterate()
+    gc.collect()
+    end_traced = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    cells = size * size
+    place_bytes, host_bytes = agent_sizes(city)
+    return {
+        'init_bytes_per_cell': init_traced / cells,
+        'end_bytes_per_cell': end_traced / cells,
+        'place_bytes': place_bytes,
+        'host_bytes': host_bytes,
+    }
+
+
+def format_row(size, result, baseline=None):
+    """Fila del informe: cada medida, o "baseline -> actual (cambio)" si hay baseline."""
+    cells = [f"{size:>10}"]
+    for key, _ in COLUMNS:
+        if baseline is None:
+            cells.append(f"{result[key]:>20.0f}")
+        else:
+            change = f"{result[key] / baseline[key] - 1:+.0%}" if baseline[key] else "n/a"
+            cells.append(f"{f'{baseline[key]:.0f} -> {result[key]:.0f} ({change})':>20}")
+    return " ".join(cells)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 300])
+    parser.add_argument("--steps", type=int, default=60)
+    parser.add_argument("--baseline", help="Baseline JSON con el que comparar (antes -> ahora)")
+    parser.add_argument("--save-baseline", help="Guarda los resultados como nuevo baseline")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved['steps'] != args.steps:
+            sys.exit(f"El baseline {args.baseline} se midió con --steps {saved['steps']}, no {args.steps}")
+        baseline = saved['results']
+
+    print(f"{'GRID_SIZE':>10} " + " ".join(f"{title.format(steps=args.steps):>20}" for _, title in COLUMNS))
+    results = {}
+    for size in args.sizes:
+        results[str(size)] = measure(size, args.steps)
+        print(format_row(size, results[str(size)], baseline.get(str(size))), flush=True)
+        if args.baseline and str(size) not in baseline:
+            print(f"{'':>10} (GRID_SIZE {size} no está en el baseline)")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({'steps': args.steps, 'results': results}, f, indent=2)
+        print(f"Resultados guardados en {args.save_baseline}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# benchmarks/bench_step.py
+"""
+Mide el tiempo medio de City.iterate() en función del tamaño de la grid.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/bench_step.py --sizes 10 50 100 --steps 5
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.final_project.city import City
+
+AREA_RATES = {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)}
+SEED = 42
+
+
+def time_steps(size, steps, seed=SEED):
+    """Devuelve (segundos de initialize, segundos medios por iterate) para una grid size x size."""
+    city = City(size, AREA_RATES, seed)
+
+    start = time.perf_counter()
+    city.initialize()
+    init_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        city.iterate()
+    step_time = (time.perf_counter() - start) / steps
+
+    return init_time, step_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 50, 100])
+    parser.add_argument("--steps", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'grid':>6} {'places':>9} {'init (s)':>10} {'step (ms)':>10}")
+    for size in args.sizes:
+        init_time, step_time = time_steps(size, args.steps)
+        print(f"{size:>6} {size * size:>9} {init_time:>10.3f} {step_time * 1000:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
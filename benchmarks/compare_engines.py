@@ -0,0 +1,77 @@
+# benchmarks/compare_engines.py
+"""
+Compara el motor de objetos (City) con el motor de arrays (ArrayCity) en grids pequeñas.
+
+Para varias seeds se ejecuta la simulación con los dos motores y se comparan las
+estadísticas de mercado: precio medio final, número de ventas y riqueza media.
+Los dos motores usan los mismos flujos aleatorios (rng.py) y generan las ofertas en el
+mismo orden, así que las estadísticas deben coincidir exactamente.
+
+Uso (desde la raíz del repositorio):
+    python benchmarks/compare_engines.py --size 10 --seeds 10 --steps 60
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.final_project.array_city import ArrayCity
+from src.final_project.city import City
+
+AREA_RATES = {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)}
+
+
+def market_stats(city, steps):
+    """Simula `steps` meses y devuelve (precio medio final, nº de ventas, riqueza media)."""
+    city.initialize()
+    n_sales = 0
+    for _ in range(steps):
+        n_sales += len(city.iterate())
+
+    if isinstance(city, ArrayCity):
+        wealth = city.get_host_wealth()['wealth']
+    else:
+        wealth = [host.profits + sum(city.places[p].get_ask_price() for p in host.assets)
+                  for host in city.hosts.values()]
+    return city.get_average_ask_price(), n_sales, float(np.mean(wealth))
+
+
+def compare(size, seeds, steps, is_v1_active=False):
+    """Devuelve un dict {motor: array (seeds x 3)} con las estadísticas de cada seed."""
+    results = {"object": [], "array": []}
+    for seed in range(seeds):
+        results["object"].append(market_stats(City(size, AREA_RATES, seed, is_v1_active), steps))
+        results["array"].append(market_stats(ArrayCity(size, AREA_RATES, seed, is_v1_active), steps))
+    return {engine: np.array(rows) for engine, rows in results.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size", type=int, default=10)
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=60)
+    parser.add_argument("--v1", action="store_true", help="Activa la regla V1")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    results = compare(args.size, args.seeds, args.steps, args.v1)
+    print(f"{args.seeds} seeds x {args.steps} pasos en {time.perf_counter() - start:.1f} s\n")
+
+    labels = ["precio medio final", "ventas", "riqueza media"]
+    print(f"{'estadística':>20} {'object':>14} {'array':>14} {'dif. rel.':>10}")
+    for col, label in enumerate(labels):
+        obj = results["object"][:, col].mean()
+        arr = results["array"][:, col].mean()
+        print(f"{label:>20} {obj:>14.1f} {arr:>14.1f} {abs(arr - obj) / max(abs(obj), 1e-9):>10.2%}")
+
+    identical = np.array_equal(results["object"], results["array"])
+    print(f"\nResultados idénticos seed a seed: {'sí' if identical else 'NO'}")
+
+
+if __name__ == "__main__":
+    main()
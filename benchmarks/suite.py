@@ -0,0 +1,179 @@
+# benchmarks/suite.py
+"""
+Suite de benchmarks reproducible (seeds fijas) de la simulación.
+
+Mide:
+    grid      -> pasos por segundo y memoria pico de iterate() para varios GRID_SIZE y motores
+    matching  -> coste de approve_bids (matching.match_bids / match_bid_arrays) según el nº de ofertas
+    run       -> tiempo total de main.run_simulation para V0 y V1
+
+Los resultados se escriben en JSON y se pueden comparar con un baseline guardado:
+
+    python benchmarks/suite.py --output results.json
+    python benchmarks/suite.py --compare benchmarks/baseline.json --tolerance 0.3
+    python benchmarks/suite.py --save-baseline benchmarks/baseline.json
+
+Con --compare, el programa termina con código 1 si alguna métrica es más lenta que el
+baseline en más de `tolerance` (por ejemplo 0.3 = 30 %). Los tiempos dependen de la máquina:
+el baseline solo tiene sentido comparado con ejecuciones en la misma máquina.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main as simulation
+from benchmarks.bench_matching import synthetic_bids
+from src.final_project.matching import match_bid_arrays, match_bids
+from src.final_project.sweep import ENGINES
+
+SEED = 42
+AREA_RATES = {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)}
+
+FULL = {'grid_sizes': [10, 50, 100, 300, 500], 'grid_steps': 12,
+        'bid_counts': [1_000, 10_000, 100_000, 1_000_000], 'engines': ['object', 'array']}
+QUICK = {'grid_sizes': [10, 50, 100], 'grid_steps': 5,
+         'bid_counts': [1_000, 10_000, 100_000], 'engines': ['object', 'array']}
+
+
+class _Host:
+    def __init__(self, profits):
+        self.profits = profits
+
+
+def bench_grid(engine, size, steps):
+    """Tiempo de initialize, pasos por segundo y memoria pico (MB) de una grid size x size."""
+    # Calentamiento sin medir: la primera llamada de cada motor paga cachés, imports perezosos
+    # y reservas de memoria que no forman parte del coste por mes
+    warmup = ENGINES[engine](size, AREA_RATES, SEED)
+    warmup.initialize()
+    warmup.iterate()
+    del warmup
+
+    city = ENGINES[engine](size, AREA_RATES, SEED)
+    start = time.perf_counter()
+    city.initialize()
+    init_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for _ in range(steps):
+        city.iterate()
+    step_seconds = (time.perf_counter() - start) / steps
+
+    # Segunda ejecución (más corta) con tracemalloc para la memoria pico, que ralentiza mucho
+    tracemalloc.start()
+    city = ENGINES[engine](size, AREA_RATES, SEED)
+    city.initialize()
+    city.iterate()
+    peak_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+    tracemalloc.stop()
+
+    return {'init_seconds': init_seconds, 'step_seconds': step_seconds,
+            'steps_per_second': 1 / step_seconds, 'peak_mb': peak_mb}
+
+
+def bench_matching(n_bids):
+    """Segundos de approve_bids con ofertas en diccionarios (City) y en arrays (ArrayCity)."""
+    place_ids, buyer_ids, spreads, bid_prices, budgets = synthetic_bids(n_bids, seed=SEED)
+    bids = [{'place_id': p, 'seller_id': -1, 'buyer_id': b, 'spread': s, 'bid_price': bp}
+            for p, b, s, bp in zip(place_ids.tolist(), buyer_ids.tolist(), spreads.tolist(), bid_prices.tolist())]
+    hosts = {host_id: _Host(profits) for host_id, profits in enumerate(budgets.tolist())}
+
+    start = time.perf_counter()
+    match_bids(bids, hosts)
+    dict_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    match_bid_arrays(place_ids, buyer_ids, spreads, bid_prices, budgets)
+    array_seconds = time.perf_counter() - start
+    return {'dict_seconds': dict_seconds, 'array_seconds': array_seconds}
+
+
+def bench_run(engine, is_v1_active):
+    """Segundos de main.run_simulation completo (SIMULATION_STEPS meses, GRID_SIZE por defecto)."""
+    start = time.perf_counter()
+    simulation.run_simulation(engine=engine, is_v1_active=is_v1_active)
+    return {'seconds': time.perf_counter() - start}
+
+
+def run_suite(params):
+    """Ejecuta todos los benchmarks y devuelve un dict {nombre: métricas}."""
+    results = {}
+    for engine in params['engines']:
+        for size in params['grid_sizes']:
+            name = f"grid/{engine}/{size}"
+            results[name] = bench_grid(engine, size, params['grid_steps'])
+            print(f"{name:<24} {results[name]['steps_per_second']:>10.2f} pasos/s "
+                  f"{results[name]['peak_mb']:>9.1f} MB", flush=True)
+
+    for n_bids in params['bid_counts']:
+        name = f"matching/{n_bids}"
+        results[name] = bench_matching(n_bids)
+        print(f"{name:<24} {results[name]['dict_seconds']:>10.3f} s (dicts) "
+              f"{results[name]['array_seconds']:>8.3f} s (arrays)", flush=True)
+
+    for engine in params['engines']:
+        for version, is_v1_active in enumerate([False, True]):
+            name = f"run/{engine}/v{version}"
+            results[name] = bench_run(engine, is_v1_active)
+            print(f"{name:<24} {results[name]['seconds']:>10.3f} s", flush=True)
+
+    return results
+
+
+# Métricas que se comparan con el baseline: para todas, más alto = peor
+TIMED_METRICS = ('init_seconds', 'step_seconds', 'dict_seconds', 'array_seconds', 'seconds', 'peak_mb')
+
+
+def compare(results, baseline, tolerance):
+    """Devuelve la lista de regresiones (nombre, métrica, baseline, actual) por encima de la tolerancia."""
+    regressions = []
+    for name, metrics in results.items():
+        for metric, value in metrics.items():
+            reference = baseline.get(name, {}).get(metric)
+            if metric in TIMED_METRICS and reference and value > reference * (1 + tolerance):
+                regressions.append((name, metric, reference, value))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quick", action="store_true", help="Tamaños más pequeños (menos de un minuto)")
+    parser.add_argument("--output", help="Fichero JSON donde guardar los resultados")
+    parser.add_argument("--compare", help="Baseline JSON con el que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.3)
+    parser.add_argument("--save-baseline", help="Guarda los resultados como nuevo baseline")
+    args = parser.parse_args()
+
+    params = QUICK if args.quick else FULL
+    report = {
+        'meta': {'python': platform.python_version(), 'machine': platform.machine(),
+                 'seed': SEED, 'params': params, 'date': time.strftime("%Y-%m-%d %H:%M:%S")},
+        'results': run_suite(params),
+    }
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+            print(f"Resultados guardados en {path}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)['results']
+        regressions = compare(report['results'], baseline, args.tolerance)
+        for name, metric, reference, value in regressions:
+            print(f"REGRESIÓN {name} {metric}: {reference:.4g} -> {value:.4g} ({value / reference - 1:+.0%})")
+        if regressions:
+            sys.exit(1)
+        print(f"Sin regresiones respecto a {args.compare} (tolerancia {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,157 +1,95 @@
 # main.py
 
-import random
-import matplotlib.pyplot as plt
 import pandas as pd
-import numpy as np
 import os
-from src.final_project.city import City
+import argparse
+from src.final_project.profiling import PhaseProfiler
+from src.final_project.plots import GRAPH1_MODES, RenderQueue, generate_graph1, generate_graph2
+from src.final_project.replicas import run_replicas
+from src.final_project.sweep import ENGINES, make_configs, run_scenario, run_sweep
 
 # Configuración
 GRID_SIZE = 10
 AREA_RATES = {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)}
 SIMULATION_STEPS = 180 # 15 años * 12 meses
 SEED = 42
+ENGINE = "object" # "object" (City, un objeto por Place/Host), "array" (ArrayCity, NumPy) o "sharded" (ShardedCity, varios procesos)
 
-def run_simulation(city):
-    """Ejecuta el bucle principal de la simulación."""
-    
-    # Inicializar la ciudad
-    city.initialize()
-    
-    # Datos para el seguimiento a lo largo del tiempo (opcional, pero útil para graph2)
-    # Ejemplo: seguimiento del precio medio de venta
-    avg_price_history = [] 
-    
-    # Bucle de simulación
-    for _ in range(1, SIMULATION_STEPS + 1):
-        city.iterate()
-        
-        # Recopilar datos para el seguimiento
-        all_prices = [place.get_ask_price() for place in city.places.values()]
-        if all_prices:
-            avg_price_history.append(sum(all_prices) / len(all_prices))
-
-    return avg_price_history
-
-def calculate_host_wealth(city):
-    """Calcula la riqueza total de cada host."""
-    wealth_data = []
-    
-    for host_id, host in city.hosts.items():
-        total_assets_value = 0
-        # Suma el precio de venta más reciente de todas las propiedades
-        for place_id in host.assets:
-            place = city.places[place_id]
-            total_assets_value += place.get_ask_price()
-            
-        # Riqueza = Ganancias + Valor de los Activos
-        total_wealth = host.profits + total_assets_value
-        
-        wealth_data.append({
-            'host_id': host_id,
-            'wealth': total_wealth,
-            'area_of_origin': host.area_of_origin
-        })
-        
-    return pd.DataFrame(wealth_data)
-
-# ------------------------------------------------------------------
-# FUNCIONES DE GRÁFICOS
-# ------------------------------------------------------------------
-
-def generate_graph1(wealth_df, filename="reports/graph1.png"):
+def run_simulation(city=None, engine=ENGINE, is_v1_active=False):
     """
-    Genera el gráfico de barras vertical de riqueza total de los hosts.
-    - Altura: Riqueza total.
-    - Color: Área de origen.
-    - Orden: De menor a mayor riqueza.
+    Simula SIMULATION_STEPS meses (con sweep.run_scenario) y devuelve el historial del precio
+    medio de venta. Si no se pasa una ciudad, se crea una con el motor `engine`
+    ("object", "array" o "sharded") y la configuración de este fichero.
     """
-    
-    # 1. Ordenar por riqueza
-    wealth_df = wealth_df.sort_values(by='wealth').reset_index(drop=True)
-    
-    # 2. Definir colores para las áreas
-    colors = {0: '#3498db', 1: '#2ecc71', 2: '#e74c3c', 3: '#f39c12'}
-    bar_colors = [colors[area] for area in wealth_df['area_of_origin']]
-    
-    plt.figure(figsize=(20, 10)) # Un tamaño más grande para 100 barras
-    
-    # 3. Graficar
-    plt.bar(wealth_df['host_id'].astype(str), wealth_df['wealth'], color=bar_colors)
-    
-    plt.title('Total Wealth of Hosts at the End of the Simulation', fontsize=16)
-    plt.xlabel('Host ID (Sorted by Wealth)', fontsize=14)
-    plt.ylabel('Total Wealth (Profits + Asset Value)', fontsize=14)
-    
-    # 4. Leyenda para los colores de las áreas
-    handles = [plt.Rectangle((0,0),1,1, color=colors[area]) for area in colors]
-    labels = [f'Area {area}' for area in colors]
-    plt.legend(handles, labels, title='Área de Origen', fontsize=12)
-    
-    # Reducir ticks del eje X para mejor visualización
-    n = len(wealth_df)
-    tick_positions = np.arange(0, n, max(1, n // 20)) # Mostrar máximo 20 ticks
-    plt.xticks(tick_positions, wealth_df['host_id'].iloc[tick_positions].astype(str), rotation=90, fontsize=8)
-    
-    plt.tight_layout()
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    plt.savefig(filename)
-    print(f" Gráfico 1 guardado en {filename}")
-    plt.close()
-
-def generate_graph2(avg_price_history, version, filename_template="reports/graph2_v{}.png"):
-    """Genera el gráfico adicional que muestra un aspecto interesante."""
-    
-    filename = filename_template.format(version)
-    
-    plt.figure(figsize=(10, 6))
-    plt.plot(range(1, len(avg_price_history) + 1), avg_price_history, 
-             label=f'V{version} Promedio de Precio', color='purple' if version == 0 else 'green')
-    
-    title = f'V{version}: Evolution of the Average Sale Price'
-    if version == 1:
-        title += ' (Modified Rule: Hosts Only Buy in Their Origin Area)'
-        
-    plt.title(title)
-    plt.xlabel('Time Step (Months)')
-    plt.ylabel('Average Sale Price')
-    plt.grid(True, alpha=0.5)
-    
-    plt.tight_layout()
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    plt.savefig(filename)
-    print(f" Gráfico 2 V{version} guardado en {filename}")
-    plt.close()
+    config = {'seed': SEED, 'grid_size': GRID_SIZE, 'area_rates': AREA_RATES,
+              'steps': SIMULATION_STEPS, 'engine': engine, 'is_v1_active': is_v1_active}
+    if city is not None:
+        engine = next((name for name, cls in ENGINES.items() if type(city) is cls), engine)
+        config.update(seed=city.seed, grid_size=city.size, area_rates=city.area_rates,
+                      is_v1_active=city.is_v1_active, engine=engine)
+    return run_scenario(config, city=city)['avg_price_history']
 
 # ------------------------------------------------------------------
 # EJECUCIÓN PRINCIPAL
 # ------------------------------------------------------------------
 
 if __name__ == "__main__":
-    
-    # --- V0: Versión Original del Modelo ---
-    print("Iniciando Simulación (Versión Original V0)...")
-    city_v0 = City(GRID_SIZE, AREA_RATES, SEED, is_v1_active=False)
-    random.seed(SEED) # Resetear seed para la reproducibilidad
-    avg_price_history_v0 = run_simulation(city_v0)
-    
+
+    parser = argparse.ArgumentParser(description="Simulación del mercado de alquiler turístico (V0 y V1).")
+    parser.add_argument("--profile", action="store_true",
+                        help="Mide el tiempo de cada fase de City.iterate y muestra un resumen")
+    parser.add_argument("--profile-out", default="reports/profile_v{}.csv",
+                        help="Fichero (.csv o .json) para la línea temporal de cada versión")
+    parser.add_argument("--listings", default=None,
+                        help="listings.csv.gz de Inside Airbnb del que sortear las tarifas iniciales")
+    parser.add_argument("--results", default=None,
+                        help="Carpeta donde guardar precios, ventas y riqueza de cada escenario (ver results.py)")
+    parser.add_argument("--replicas", type=int, default=0,
+                        help="Nº de réplicas Monte Carlo (otras seeds) para dibujar bandas en el gráfico 2")
+    parser.add_argument("--graph1-mode", default="auto", choices=GRAPH1_MODES,
+                        help="Forma del gráfico 1: una barra por host, grupos por cuantiles o curva de Lorenz")
+    args = parser.parse_args()
+
+    # V0 (versión original) y V1 (los hosts solo compran en su área de origen) se simulan
+    # a la vez en dos procesos. Cada ciudad tiene sus propios generadores aleatorios,
+    # así que los resultados no dependen del orden ni del número de procesos.
+    print("Iniciando Simulaciones V0 (Original) y V1 (Modificada) en paralelo...")
+    configs = make_configs(seeds=[SEED], grid_sizes=[GRID_SIZE], area_rates_options=[AREA_RATES],
+                           v1_options=[False, True], steps=SIMULATION_STEPS, engine=ENGINE,
+                           profile=args.profile, listings=args.listings, results=args.results)
+    result_v0, result_v1 = run_sweep(configs)
+
+    if args.profile:
+        for version, result in enumerate([result_v0, result_v1]):
+            profiler = PhaseProfiler.from_records(result['profile'])
+            print(f"\nPerfil por fases V{version}:")
+            print(profiler.summary())
+            filename = args.profile_out.format(version)
+            os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+            if filename.endswith(".json"):
+                profiler.to_json(filename)
+            else:
+                profiler.to_csv(filename)
+            print(f" Perfil V{version} guardado en {filename}")
+
+    # Réplicas Monte Carlo (ver replicas.py): media y percentiles del precio medio de cada mes
+    price_bands = [None, None]
+    if args.replicas:
+        print(f"Simulando {args.replicas} réplicas de V0 y V1...")
+        for version, is_v1_active in enumerate([False, True]):
+            replicas = run_replicas(GRID_SIZE, AREA_RATES, SIMULATION_STEPS, SEED, is_v1_active, args.replicas)
+            price_bands[version] = replicas['avg_price_bands']
+
     # Calcular Riqueza V0
-    wealth_df_v0 = calculate_host_wealth(city_v0)
-    
-    # Generar Gráficos V0
-    generate_graph1(wealth_df_v0) 
-    generate_graph2(avg_price_history_v0, version=0)
+    wealth_df_v0 = pd.DataFrame(result_v0['wealth'])
+
+    # Los gráficos se dibujan en procesos aparte (backend Agg, ver plots.py)
+    with RenderQueue() as renders:
+        # Generar Gráficos V0
+        renders.submit(generate_graph1, wealth_df_v0, mode=args.graph1_mode)
+        renders.submit(generate_graph2, result_v0['avg_price_history'], version=0, bands=price_bands[0])
+
+        # Generar Gráfico V1
+        renders.submit(generate_graph2, result_v1['avg_price_history'], version=1, bands=price_bands[1])
 
-    # --- V1: Versión Modificada del Modelo ---
-    # Para activar el cambio, descomenta las líneas en src/final_project/hosts.py
-    # donde se usa `city.is_v1_active`.
-    print("\nIniciando Simulación (Versión Modificada V1)...")
-    city_v1 = City(GRID_SIZE, AREA_RATES, SEED, is_v1_active=True)
-    random.seed(SEED) # Resetear seed para la reproducibilidad
-    avg_price_history_v1 = run_simulation(city_v1)
-    
-    # Generar Gráfico V1
-    generate_graph2(avg_price_history_v1, version=1)
-    
-    print("\nSimulación completa. Verifica la carpeta 'reports/'.")
\ No newline at end of file
+    print("\nSimulación completa. Verifica la carpeta 'reports/'.")
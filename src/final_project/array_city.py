@@ -0,0 +1,294 @@
+# src/final_project/array_city.py
+
+import numpy as np
+
+from .grid import INITIAL_PRICE_FACTOR, grid_areas, initial_rates
+from .matching import match_bid_arrays
+from .price_history import PriceLog
+from .neighbors import NeighborIndex
+from .quiescence import bid_thresholds, quiet_months
+from .rng import StreamBank
+
+
+class ArrayCity:
+    """
+    Motor alternativo de la simulación con la misma interfaz que City
+    (initialize / iterate / clear_market), pero guardando el estado en arrays de NumPy
+    contiguos (struct-of-arrays) en vez de un objeto Place y un objeto Host por celda.
+
+    Los índices de los arrays son los place_id. Igual que en City, el host i empieza
+    siendo el dueño del place i, así que también hay un host por celda.
+    """
+
+    def __init__(self, size, area_rates, seed=42, is_v1_active=False, price_history_limit=None):
+        self.size = size
+        self.area_rates = area_rates
+        self.seed = seed
+        self.step = 0
+        self.is_v1_active = is_v1_active
+
+        n = size * size
+        # Un flujo aleatorio por place: da los mismos sorteos que Place.rng en City
+        self.rng = StreamBank(seed, n)
+        self.n_places = n
+        self.n_hosts = n
+
+        # Estado de los places
+        self.area = np.zeros(n, dtype=np.int8)
+        self.rate = np.zeros(n, dtype=np.int64)
+        self.occupancy = np.zeros(n, dtype=np.float64)
+        self.owner = np.zeros(n, dtype=np.int64)       # host_id del propietario actual
+        self.ask_price = np.zeros(n, dtype=np.float64)  # precio de venta más reciente
+
+        # Estado de los hosts
+        self.profits = np.zeros(n, dtype=np.float64)
+        self.area_of_origin = np.zeros(n, dtype=np.int8)
+
+        # Historial de ventas: (step, place_id, precio) de cada transacción ejecutada
+        # price_history_limit: None = todas, K = las últimas K, 0 = ninguna
+        self.price_history_limit = price_history_limit
+        self.price_log = PriceLog(price_history_limit)
+
+        # Observadores que reciben avisos de la simulación (ver metrics.py)
+        self.observers = []
+        self.initialized = False
+
+        # Instrumentación por fases (ver profiling.py). None = desactivada
+        self.profiler = None
+        self._phase_start = 0.0
+
+        # Aristas (place, vecino) de la grid, calculadas una vez en initialize
+        self.edge_src = np.zeros(0, dtype=np.int64)
+        self.edge_dst = np.zeros(0, dtype=np.int64)
+
+    # METODO 1
+    def initialize(self, rates=None):
+        """
+        Asigna áreas, tarifas, precios iniciales, propietarios y vecinos de toda la grid.
+        `rates` (opcional): una tarifa inicial por place en vez de la uniforme de area_rates (ver grid.py).
+        """
+        n = self.n_places
+        place_ids = np.arange(n, dtype=np.int64)
+
+        # 1. Áreas (cuadrantes de la grid, ver grid.py)
+        self.area = grid_areas(self.size)
+
+        # 2. Tarifas uniformes dentro del rango de cada área (o las dadas) y precio inicial = tarifa * 900
+        self.rate = initial_rates(self.area, self.area_rates, self.rng, rates)
+        self.ask_price = self.rate * float(INITIAL_PRICE_FACTOR)
+
+        # 3. Cada host empieza con el place de su misma celda
+        self.owner = place_ids.copy()
+        self.area_of_origin = self.area.copy()
+        self.profits = np.zeros(self.n_hosts, dtype=np.float64)
+
+        # 4. Vecinos como lista de aristas (src -> dst), sacada del índice CSR compartido
+        self.neighbor_index = NeighborIndex(self.size)
+        self.edge_src, self.edge_dst = self.neighbor_index.edges()
+
+        self.initialized = True
+        for observer in self.observers:
+            observer.on_start(self)
+
+    # METODO AUXILIAR
+    def add_observer(self, observer):
+        """Registra un observador (ver metrics.py) y lo devuelve."""
+        self.observers.append(observer)
+        if self.initialized:
+            observer.on_start(self)
+        return observer
+
+    # METODO AUXILIAR
+    def get_area_avg_rates(self):
+        """Devuelve un array con la tarifa media de cada área (100 si un área está vacía)."""
+        n_areas = max(self.area_rates) + 1
+        sums = np.bincount(self.area, weights=self.rate, minlength=n_areas)
+        counts = np.bincount(self.area, minlength=n_areas)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), 100.0)
+
+    # METODO AUXILIAR
+    def update_occupancy(self):
+        """Sortea la ocupación de todos los places a la vez (5-15 días si la tarifa supera la media del área, 10-20 si no)."""
+        above_mean = self.rate > self.get_area_avg_rates()[self.area]
+        # randint(5, 15) y randint(10, 20) usan el mismo sorteo u en [0, 10]: 5 + u o 10 + u
+        draws = self.rng.randint(0, 10)
+        self.occupancy = np.where(above_mean, 5 + draws, 10 + draws).astype(np.float64)
+
+    # METODO AUXILIAR
+    def update_profits(self):
+        """Suma a cada host las ganancias (tarifa * ocupación) de todos sus places."""
+        earnings = self.rate * self.occupancy
+        host_earnings = np.bincount(self.owner, weights=earnings, minlength=self.n_hosts)
+        self.profits += host_earnings
+        if self.observers:
+            host_ids = np.arange(self.n_hosts)
+            for observer in self.observers:
+                observer.on_profit_update_batch(self, host_ids, host_earnings)
+
+    # METODO AUXILIAR
+    def make_bids(self):
+        """
+        Genera todas las ofertas del mes de una vez.
+
+        Devuelve arrays (place_id, seller_id, buyer_id, spread, bid_price) con una fila
+        por par (host, place vecino no propio) que el host puede pagar.
+        """
+        asset_counts = np.bincount(self.owner, minlength=self.n_hosts)
+        can_bid = (asset_counts > 0) & (self.profits > 0)
+
+        buyers = self.owner[self.edge_src]
+        targets = self.edge_dst
+        mask = can_bid[buyers]
+        mask &= self.owner[targets] != buyers
+        # Filtramos por presupuesto antes de quitar duplicados: quedan muy pocas aristas
+        mask &= self.profits[buyers] >= self.ask_price[targets]
+        if self.is_v1_active:
+            # Lógica V1: el host solo puede comprar en su área de origen
+            mask &= self.area[targets] == self.area_of_origin[buyers]
+
+        # Un host puede ser vecino del mismo place por varios de sus assets: quitamos duplicados
+        keys = np.unique(buyers[mask] * self.n_places + targets[mask])
+        buyers = keys // self.n_places
+        targets = keys % self.n_places
+
+        budgets = self.profits[buyers]
+        return targets, self.owner[targets], buyers, budgets - self.ask_price[targets], budgets
+
+    # METODO 2
+    def approve_bids(self, bids):
+        """Aplica la regla greedy de City.approve_bids: mayor spread primero, un place y una compra por host al mes."""
+        place_ids, seller_ids, buyer_ids, spreads, bid_prices = bids
+        approved = match_bid_arrays(place_ids, buyer_ids, spreads, bid_prices, self.profits)
+        return [{
+            'place_id': int(place_ids[i]),
+            'seller_id': int(seller_ids[i]),
+            'buyer_id': int(buyer_ids[i]),
+            'spread': float(spreads[i]),
+            'bid_price': float(bid_prices[i]),
+        } for i in approved.tolist()]
+
+    # METODO 3
+    def execute_transactions(self, transactions):
+        """Transfiere la propiedad y el dinero de cada transacción aprobada."""
+        # Se aplican en orden (como en City) para que las sumas en coma flotante coincidan
+        for tx in transactions:
+            place_id = tx['place_id']
+            bid_price = tx['bid_price']
+            self.owner[place_id] = tx['buyer_id']
+            self.profits[tx['buyer_id']] -= bid_price
+            self.profits[tx['seller_id']] += bid_price
+            previous_price = float(self.ask_price[place_id])
+            self.ask_price[place_id] = bid_price
+            self.price_log.append(self.step, place_id, bid_price)
+            for observer in self.observers:
+                observer.on_transaction(self, tx, previous_price)
+
+    # METODO 4
+    def clear_market(self):
+        """Coordina el proceso completo de clearing."""
+        prof = self.profiler
+        bids = self.make_bids()
+        if prof is not None:
+            self._phase_start = prof.lap("bids", self._phase_start, calls=1, items=len(bids[0]))
+
+        approved_transactions = self.approve_bids(bids)
+        if prof is not None:
+            self._phase_start = prof.lap("approve", self._phase_start, calls=1, items=len(bids[0]))
+
+        if approved_transactions:
+            self.execute_transactions(approved_transactions)
+        if prof is not None:
+            self._phase_start = prof.lap("execute", self._phase_start, calls=1, items=len(approved_transactions))
+        return approved_transactions
+
+    # METODO 5
+    def iterate(self):
+        """Avanza la simulación un paso (mes)."""
+        self.step += 1
+        prof = self.profiler
+        if prof is not None:
+            self._phase_start = prof.start(self.step)
+
+        self.update_occupancy()
+        if prof is not None:
+            self._phase_start = prof.lap("occupancy", self._phase_start, calls=1)
+
+        self.update_profits()
+        if prof is not None:
+            self._phase_start = prof.lap("profits", self._phase_start, calls=1)
+
+        transactions = self.clear_market()
+        for observer in self.observers:
+            observer.on_step(self, transactions)
+        return transactions
+
+    # METODO 6
+    def fast_forward(self, max_steps):
+        """
+        Avanza de golpe los meses siguientes en los que ningún host puede pagar ningún place
+        de su frontera (como mucho max_steps), con los mismos sorteos, ganancias y avisos a
+        los observadores que iterate (con places y hosts ya al día en cada aviso).
+        Devuelve cuántos meses ha avanzado (ver quiescence.py).
+        """
+        if max_steps <= 0:
+            return 0
+        prof = self.profiler
+        if prof is not None:
+            self._phase_start = prof.start(self.step + 1)
+
+        v1 = (self.area, self.area_of_origin) if self.is_v1_active else ()
+        thresholds = bid_thresholds(self.owner, self.ask_price, self.edge_src, self.edge_dst, self.n_hosts, *v1)
+        above_mean = self.rate > self.get_area_avg_rates()[self.area]
+
+        host_ids = np.arange(self.n_hosts)
+        start = self.step
+        for month_occupancy, month_earnings in quiet_months(self.rng, self.rng.counter, self.rate, above_mean,
+                                                            self.owner, self.profits, thresholds, max_steps):
+            # Estado de cada mes antes de avisar a los observadores, como en iterate
+            for occupancy, host_earnings in zip(month_occupancy, month_earnings):
+                self.step += 1
+                self.rng.counter += 1
+                self.occupancy[:] = occupancy # en el sitio: en ShardedCity es memoria compartida
+                self.profits += host_earnings
+                for observer in self.observers:
+                    observer.on_profit_update_batch(self, host_ids, host_earnings)
+                for observer in self.observers:
+                    observer.on_step(self, [])
+
+        if prof is not None and self.step > start:
+            # Solo los saltos de verdad: calls = meses avanzados (ver PhaseProfiler.totals)
+            self._phase_start = prof.lap("fast_forward", self._phase_start, calls=self.step - start)
+        return self.step - start
+
+    def advance(self, steps, fast_forward=True):
+        """
+        Avanza la simulación `steps` meses. Con fast_forward, después de cada mes sin ventas
+        (mercado parado) salta de golpe los meses en que sigue sin haber ofertas posibles.
+        """
+        end = self.step + steps
+        while self.step < end:
+            if not self.iterate() and fast_forward:
+                self.fast_forward(end - self.step)
+
+    # METODOS DE CONSULTA
+    def get_average_ask_price(self):
+        """Precio de venta medio de todos los places."""
+        return float(self.ask_price.mean()) if self.n_places else 0.0
+
+    def get_place_table(self):
+        """Devuelve un dict de arrays con place_id, area, host_id y ask_price de cada place."""
+        return {
+            'place_id': np.arange(self.n_places),
+            'area': self.area,
+            'host_id': self.owner,
+            'ask_price': self.ask_price,
+        }
+
+    def get_host_wealth(self):
+        """Devuelve un dict de arrays con host_id, wealth (ganancias + valor de los assets) y area_of_origin."""
+        assets_value = np.bincount(self.owner, weights=self.ask_price, minlength=self.n_hosts)
+        return {
+            'host_id': np.arange(self.n_hosts),
+            'wealth': self.profits + assets_value,
+            'area_of_origin': self.area_of_origin,
+        }
@@ -0,0 +1,230 @@
+# src/final_project/checkpoint.py
+"""
+Snapshots binarios del estado completo de una ciudad (City o ArrayCity).
+
+Con un snapshot se puede guardar una simulación en el mes 120 y después continuar desde
+ahí (por ejemplo, una rama con V0 y otra con V1) o retomarla tras un fallo, sin volver a
+empezar desde initialize(). La ciudad restaurada continúa exactamente igual que la original.
+
+Formato (versión 1), todo en little-endian:
+    b"CITYSNAP" | versión (uint32) | longitud de la cabecera (uint32) | cabecera JSON
+    ... arrays binarios, cada uno alineado a 64 bytes
+
+La cabecera guarda la configuración de la ciudad, el step y la posición (dtype, forma,
+offset) de cada array, así que los arrays se pueden abrir con np.memmap sin copiarlos.
+Los observadores (metrics.py) no forman parte del snapshot.
+"""
+
+import json
+import struct
+from array import array
+
+import numpy as np
+
+from .array_city import ArrayCity
+from .city import City
+from .hosts import Host
+from .neighbors import NeighborIndex
+from .place import Place
+
+MAGIC = b"CITYSNAP"
+VERSION = 1
+ALIGNMENT = 64
+_PREFIX = struct.Struct("<8sII")
+
+
+def _city_arrays(city):
+    """Devuelve (engine, arrays) con todo el estado de la ciudad en forma de arrays de NumPy."""
+    if isinstance(city, ArrayCity):
+        log = city.price_log
+        start = log._start()
+        return "array", {
+            'area': city.area,
+            'rate': city.rate,
+            'occupancy': city.occupancy,
+            'owner': city.owner,
+            'ask_price': city.ask_price,
+            'rng_counter': np.array([city.rng.counter], dtype=np.int64),
+            'profits': city.profits,
+            'area_of_origin': city.area_of_origin,
+            'log_steps': np.frombuffer(log.steps, dtype=np.int64)[start:],
+            'log_place_ids': np.frombuffer(log.place_ids, dtype=np.int64)[start:],
+            'log_prices': np.frombuffer(log.prices, dtype=np.float64)[start:],
+        }
+
+    places = [city.places[place_id] for place_id in range(len(city.places))]
+    hosts = [city.hosts[host_id] for host_id in range(len(city.hosts))]
+
+    # Historiales de precios en formato CSR: offsets por place + steps y precios concatenados
+    history_steps, history_prices, lengths = [], [], []
+    for place in places:
+        history = place.price_history
+        start = history._start()
+        history_steps.append(history.steps[start:].tobytes())
+        history_prices.append(history.prices[start:].tobytes())
+        lengths.append(len(history.steps) - start)
+    history_offsets = np.zeros(len(places) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=history_offsets[1:])
+
+    return "object", {
+        'area': np.array([place.area for place in places], dtype=np.int8),
+        'rate': np.array([place.rate for place in places], dtype=np.int64),
+        'occupancy': np.array([place.occupancy for place in places], dtype=np.float64),
+        'owner': np.array([place.host_id for place in places], dtype=np.int64),
+        'ask_price': np.array([place.get_ask_price() for place in places], dtype=np.float64),
+        'rng_counter': np.array([place.rng.counter for place in places], dtype=np.int64),
+        'profits': np.array([host.profits for host in hosts], dtype=np.float64),
+        'host_area': np.array([host.area for host in hosts], dtype=np.int8),
+        'area_of_origin': np.array([host.area_of_origin for host in hosts], dtype=np.int8),
+        'history_offsets': history_offsets,
+        'history_steps': np.frombuffer(b"".join(history_steps), dtype=np.int64),
+        'history_prices': np.frombuffer(b"".join(history_prices), dtype=np.float64),
+    }
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def save_snapshot(city, path):
+    """Guarda el estado completo de `city` en `path`."""
+    engine, arrays = _city_arrays(city)
+    arrays = {name: np.ascontiguousarray(values).astype(np.asarray(values).dtype.newbyteorder('<'), copy=False)
+              for name, values in arrays.items()}
+
+    # Los offsets de la cabecera son relativos al inicio de la zona de datos
+    layout, offset = {}, 0
+    for name, values in arrays.items():
+        layout[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': offset}
+        offset = _aligned(offset + values.nbytes)
+
+    header = json.dumps({
+        'engine': engine,
+        'size': city.size,
+        'area_rates': [[area, low, high] for area, (low, high) in city.area_rates.items()],
+        'seed': city.seed,
+        'step': city.step,
+        'is_v1_active': city.is_v1_active,
+        'price_history_limit': city.price_history_limit,
+        'arrays': layout,
+    }).encode()
+    data_start = _aligned(_PREFIX.size + len(header))
+
+    with open(path, "wb") as f:
+        f.write(_PREFIX.pack(MAGIC, VERSION, len(header)))
+        f.write(header)
+        for name, values in arrays.items():
+            f.seek(data_start + layout[name]['offset'])
+            f.write(values.tobytes())
+        f.truncate(data_start + offset)
+
+
+def read_snapshot(path, mmap=True):
+    """
+    Lee un snapshot y devuelve (cabecera, arrays). Con mmap=True los arrays se abren con
+    np.memmap en modo copia-en-escritura: solo se leen del disco las partes que se usan.
+    """
+    with open(path, "rb") as f:
+        magic, version, header_len = _PREFIX.unpack(f.read(_PREFIX.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} no es un snapshot de City")
+        if version != VERSION:
+            raise ValueError(f"Versión de snapshot no soportada: {version} (se esperaba {VERSION})")
+        header = json.loads(f.read(header_len))
+    data_start = _aligned(_PREFIX.size + header_len)
+
+    arrays = {}
+    for name, info in header['arrays'].items():
+        dtype, shape = np.dtype(info['dtype']), tuple(info['shape'])
+        offset = data_start + info['offset']
+        if mmap and np.prod(shape) > 0:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='c', offset=offset, shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=int(np.prod(shape)), offset=offset).reshape(shape)
+    return header, arrays
+
+
+def load_snapshot(path, is_v1_active=None, mmap=True):
+    """
+    Reconstruye la ciudad guardada en `path` (del mismo motor con el que se guardó).
+    `is_v1_active` permite continuar la simulación con otra regla (por ejemplo, ramificar V0 y V1).
+    """
+    header, arrays = read_snapshot(path, mmap=mmap)
+    area_rates = {area: (low, high) for area, low, high in header['area_rates']}
+    if is_v1_active is None:
+        is_v1_active = header['is_v1_active']
+    engine = {"object": City, "array": ArrayCity}[header['engine']]
+    city = engine(header['size'], area_rates, header['seed'], is_v1_active=is_v1_active,
+                  price_history_limit=header['price_history_limit'])
+
+    if header['engine'] == "array":
+        _restore_array_city(city, arrays)
+    else:
+        _restore_city(city, arrays)
+
+    city.step = header['step']
+    city.initialized = True
+    return city
+
+
+def _restore_array_city(city, arrays):
+    for name in ('area', 'rate', 'occupancy', 'owner', 'ask_price', 'profits', 'area_of_origin'):
+        setattr(city, name, arrays[name])
+    city.rng.counter = int(arrays['rng_counter'][0])
+    city.neighbor_index = NeighborIndex(city.size)
+    city.edge_src, city.edge_dst = city.neighbor_index.edges()
+
+    log = city.price_log
+    log.steps = array('q', np.ascontiguousarray(arrays['log_steps']).tobytes())
+    log.place_ids = array('q', np.ascontiguousarray(arrays['log_place_ids']).tobytes())
+    log.prices = array('d', np.ascontiguousarray(arrays['log_prices']).tobytes())
+
+
+def _restore_city(city, arrays):
+    city.neighbor_index = NeighborIndex(city.size)
+
+    area = arrays['area'].tolist()
+    rate = arrays['rate'].tolist()
+    occupancy = arrays['occupancy'].tolist()
+    owner = arrays['owner'].tolist()
+    ask_price = arrays['ask_price'].tolist()
+    rng_counter = arrays['rng_counter'].tolist()
+    offsets = arrays['history_offsets'].tolist()
+    history_steps = np.ascontiguousarray(arrays['history_steps'])
+    history_prices = np.ascontiguousarray(arrays['history_prices'])
+
+    for place_id in range(len(area)):
+        place = Place(place_id, owner[place_id], city)
+        place.area = area[place_id]
+        place._rate = rate[place_id] # sin pasar por el setter: add_place suma la tarifa a su área
+        place.occupancy = occupancy[place_id]
+        place.ask_price = ask_price[place_id]
+        place.rng.counter = rng_counter[place_id]
+
+        start, end = offsets[place_id], offsets[place_id + 1]
+        place.price_history.steps = array('q', history_steps[start:end].tobytes())
+        place.price_history.prices = array('d', history_prices[start:end].tobytes())
+        city.add_place(place)
+
+    # Agrupamos los places por propietario para reconstruir los assets (y la frontera) de cada host
+    assets_by_host = {}
+    for place_id, host_id in enumerate(owner):
+        assets_by_host.setdefault(host_id, []).append(place_id)
+
+    profits = arrays['profits'].tolist()
+    host_area = arrays['host_area'].tolist()
+    area_of_origin = arrays['area_of_origin'].tolist()
+    for host_id in range(len(profits)):
+        # El host se crea con su place de origen (mismo id) y después se ajustan sus assets
+        host = Host(host_id, city.places[host_id], city)
+        owned = assets_by_host.get(host_id, [])
+        for place_id in owned:
+            if place_id != host_id:
+                host.add_asset(place_id)
+        if host_id not in owned:
+            host.remove_asset(host_id)
+
+        host.profits = profits[host_id]
+        host.area = host_area[host_id]
+        host.area_of_origin = area_of_origin[host_id]
+        city.hosts[host_id] = host
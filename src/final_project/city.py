@@ -1,102 +1,133 @@
 # src/final_project/city.py
 
-import random
-import pandas as pd
+import gc
+
+import numpy as np
+
 from .place import Place
 from .hosts import Host
+from .grid import INITIAL_PRICE_FACTOR, grid_areas, initial_rates
+from .matching import match_bids
+from .neighbors import NeighborIndex
+from .quiescence import bid_thresholds, quiet_months
+from .rng import PlaceRandom, StreamBank
 
 class City:
-    def __init__(self, size, area_rates, seed=42, is_v1_active=False):
+    def __init__(self, size, area_rates, seed=42, is_v1_active=False, price_history_limit=None):
         self.size = size
         self.area_rates = area_rates
+        self.seed = seed # Cada Place deriva su generador aleatorio de esta seed (ver rng.py)
         self.step = 0
         self.places = {}
         self.hosts = {}
+        self.neighbor_index = None # Índice CSR de vecinos, se construye en initialize()
         self.is_v1_active = is_v1_active # Flag para la versión modificada
+        # Entradas del historial de precios que guarda cada Place (None = todas, 0 = ninguna)
+        self.price_history_limit = price_history_limit
 
-        # random.seed(seed) # Asegura la reproducibilidad
-
-    # METODO 1
-    def initialize(self):
-        """Crea todos los objetos Place y Host iniciales."""
-
-        host_id_counter = 0 # aumentaremos este contador a medida que avanzamos de celda
-        total_places = self.size * self.size # 10 x 10 = 100 celdas -> los place_id seran: 0, 1, 2, ... , 99
-
-        # range(num): genera una lista que contiene los numeros del 0 al num-1, por ejemplo: range(5) -> [0, 1, 2, 3, 4]
-        # Entonces for place_id in range(total_places) seria equivalente a for place_id in [0, 1, ..., total_places-1]
-        # Esto significa que place_id ira adquiriendo los valores de la lista en cada iteracion, es decir:
-        #   iteracion 1: place_id = 0
-        #   iteracion 2: place_id = 1
-        #   iteracion 3: place_id = 2
-        #   ...
-        #   iteracion 100: place_id = 99
+        # Sumas y conteos de tarifas por área, actualizados de forma incremental
+        # para que get_area_avg_rate sea O(1) en vez de recorrer todos los Places
+        self.area_rate_sums = {}
+        self.area_rate_counts = {}
 
-        for place_id in range(total_places):
-            #Creamos una INSTANCIA de la clase PLACE
-            place = Place(place_id, host_id_counter, self)
+        # Observadores que reciben avisos de la simulación (ver metrics.py)
+        self.observers = []
+        self.initialized = False
 
-             # Inicializamos la instancia con la informacion necesaria
-            place.setup(self.size, self.area_rates)
+        # Instrumentación por fases (ver profiling.py). None = desactivada
+        self.profiler = None
+        self._phase_start = 0.0
 
-             # Añadimos el Place generado al diccionario que almacena todos los Places de la ciudad
-            # El diccionario tiene la forma de {key: valor} -> {place_id: instacia_de_la_clase_Place}
-            self.places[place_id] = place
-
-            # Crea el Host. Le pasamos el área de origen
-            host = Host(host_id_counter, place, self)
-            self.hosts[host_id_counter] = host
-
-            host_id_counter += 1 # Aumentamos el contador, es decir pasamos a la siguiente celda
+    # METODO 1
+    def initialize(self, rates=None):
+        """
+        Crea todos los objetos Place y Host iniciales.
+
+        Las áreas, tarifas y precios iniciales de toda la grid se calculan de una vez con NumPy
+        (ver grid.py), igual que en ArrayCity.
+        `rates` (opcional): una tarifa inicial por place, por ejemplo sorteada de datos reales
+        con listings.sample_rates, en vez de la tarifa uniforme de area_rates.
+        """
+
+        # Vecinos de todas las celdas, calculados una sola vez para toda la grid
+        self.neighbor_index = NeighborIndex(self.size)
+
+        # Área y tarifa de todos los places (el sorteo de la tarifa es el primero de cada flujo)
+        area = grid_areas(self.size)
+        streams = StreamBank(self.seed, len(area))
+        rate = initial_rates(area, self.area_rates, streams, rates)
+
+        # Agregados por área para get_area_avg_rate (lo que haría add_place place a place)
+        counts = np.bincount(area)
+        sums = np.bincount(area, weights=rate)
+        self.area_rate_counts = {a: int(counts[a]) for a in range(len(counts)) if counts[a]}
+        self.area_rate_sums = {a: int(sums[a]) for a in self.area_rate_counts}
+
+        # El place i empieza siendo del host i. Creamos los objetos con el área, la tarifa
+        # y la clave aleatoria de cada place ya calculadas, así cada celda solo
+        # cuesta crear sus objetos. El recolector de basura se pausa mientras tanto: con
+        # millones de objetos nuevos y ninguno que liberar, sus pasadas no hacen nada útil.
+        places, hosts = self.places, self.hosts
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            for place_id, (place_area, place_rate, key) in enumerate(
+                    zip(area.tolist(), rate.tolist(), streams.keys.tolist())):
+                # counter=streams.counter: el sorteo de la tarifa ya está hecho
+                place = Place(place_id, place_id, self, PlaceRandom.from_key(key, streams.counter))
+                place.area = place_area
+                place._rate = place_rate # sin pasar por el setter: los agregados ya están calculados
+                place.record_price(0, place_rate * INITIAL_PRICE_FACTOR)
+                places[place_id] = place
+                hosts[place_id] = Host(place_id, place, self)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+        self.initialized = True
+        for observer in self.observers:
+            observer.on_start(self)
+
+    # METODO AUXILIAR
+    def add_observer(self, observer):
+        """Registra un observador (ver metrics.py) y lo devuelve."""
+        self.observers.append(observer)
+        if self.initialized:
+            observer.on_start(self)
+        return observer
+
+    # METODO AUXILIAR
+    def add_place(self, place):
+        """Registra un Place en la ciudad y suma su tarifa a los agregados de su área."""
+        self.places[place.place_id] = place
+        self.area_rate_sums[place.area] = self.area_rate_sums.get(place.area, 0) + place.rate
+        self.area_rate_counts[place.area] = self.area_rate_counts.get(place.area, 0) + 1
+
+    # METODO AUXILIAR
+    def on_rate_change(self, place, old_rate):
+        """Actualiza la suma del área cuando cambia la tarifa de un Place registrado."""
+        if self.places.get(place.place_id) is place:
+            self.area_rate_sums[place.area] += place.rate - old_rate
 
      # METODO AUXLIAR
     def get_area_avg_rate(self, area):
-        """Calcula la tarifa promedio actual en un área."""
-        rates = [place.rate for place in self.places.values() if place.area == area]
+        """Devuelve la tarifa promedio actual en un área (O(1) gracias a los agregados)."""
+        count = self.area_rate_counts.get(area, 0)
         # Devuelve un valor por defecto si no hay listings (aunque siempre habrá)
-        return sum(rates) / len(rates) if rates else 100
+        return self.area_rate_sums[area] / count if count else 100
 
     # METODO 2
     def approve_bids(self, bids):
-        """Ordena las ofertas y determina qué transacciones son válidas."""
+        """
+        Ordena las ofertas y determina qué transacciones son válidas.
+        Usa el motor de emparejamiento de matching.py: mayor spread primero y, a igual
+        spread, la oferta que llegó antes. Cada host compra y cada Place se vende como mucho una vez al mes.
+        """
         if not bids: #si no hay ofertas...
             return [] # devolvemos una lista vacia de ofertas aprovadas
 
-          # Esto lo que hace es pasar las ofertas a un DataFrame (es como una hoja de calculo del excel)
-        df_bids = pd.DataFrame(bids)
-        # Ordenar por 'spread' descendente (oferta más alta sobre el precio de venta)
-        df_bids = df_bids.sort_values(by='spread', ascending=False)
-
-         # Una lista vacia donde iremos guardando las transacciones que vayamos aprovando
-        approved_transactions = []
-
-         # Conjunto vacio donde iremos guardando los Places que se han aprovado.
-        # Esto lo hacemos para consultar que Places han sido comprados y cuales no de forma rapida
-        sold_places = set()
-
-        # Lo mismo que con sold_places pero con compradores
-        buyers_who_bought = set()
-
-        for _, bid in df_bids.iterrows():
-            place_id = bid['place_id']
-            buyer_id = bid['buyer_id']
-
-            # 2. Comprobar disponibilidad
-            #Un comprador puede comprar como mucho 1 Place/propiedad (es decir 0 o 1 propiedades) al mes (mes = step)
-            # Y una propiedad puede ser vendida solo una vez por iteracion (es decir, solo puede ser vendida una vez al mes)
-            # if place_id not in sold_places: es decir si el identificador no esta marcado como vendido
-            # buyer_id not in buyers_who_bought: y el comprador aun no ha realizado ninguna compra
-            if place_id not in sold_places and buyer_id not in buyers_who_bought:
-
-                # Comprobar que el host comprador todavía tiene fondos (por si se modificó)
-                buyer = self.hosts.get(buyer_id) # obtenemos la instancia del host a partir de su id
-                if buyer and buyer.profits >= bid['bid_price']: # si el host tiene fondos suficientes
-                    approved_transactions.append(bid.to_dict()) # añadimos la transaccion a la lista de transacciones aprovadas. bid.to_dict() hace que el dataframe vuelva a ser un diccionario.
-                    sold_places.add(place_id) # actualizamos el conjunto de Places vendidos con la propiedad que acabamos de marcar como vendida
-                    buyers_who_bought.add(buyer_id) # lo mismo pero con el host
-
-        return approved_transactions # Devolvemos la lista de transacciones aprovadas
-    
+        return match_bids(bids, self.hosts) # Devolvemos la lista de transacciones aprovadas
+
      # METODO 3
     def execute_transactions(self, transactions):
         """Realiza las transferencias de dinero y propiedad."""
@@ -113,33 +144,46 @@ class City:
             buyer = self.hosts[buyer_id]
             seller = self.hosts[seller_id]
 
-            # 1. Actualizar Propiedad
+            # 1. Actualizar Propiedad (y la frontera de oportunidades de cada host)
             if place_id in seller.assets:
-                seller.assets.remove(place_id)  #Eliminamos la propiedad de los assets que posee el seller
-            buyer.assets.add(place_id) # añadimos la propiedad comprada al comprador
+                seller.remove_asset(place_id)  #Eliminamos la propiedad de los assets que posee el seller
+            buyer.add_asset(place_id) # añadimos la propiedad comprada al comprador
             place.host_id = buyer_id # actualizamos el propietario de la vivienda comprada, es decir, asignamos el id del comprador a la vivienda
 
             # 2. Actualizar Fondos
             buyer.profits -= bid_price
             seller.profits += bid_price
 
-            # 3. Registrar Historial de Precios
-            place.price_history[self.step] = bid_price
+            # 3. Registrar Historial de Precios (y nuevo precio de venta)
+            previous_price = place.get_ask_price()
+            place.record_price(self.step, bid_price)
+
+            for observer in self.observers:
+                observer.on_transaction(self, tx, previous_price)
 
     #METODO 4
     def clear_market(self):
         """Coordina el proceso completo de clearing."""
+        prof = self.profiler
         all_bids = []
+        bidders = 0
         for host in self.hosts.values(): # Para cada uno de los hosts miramos si...
             # tienes propiedades y su presupuesto es mayor a 0.
             if host.assets and host.profits > 0:
                 # extend es como append pero para varios elementos. Añades todas las bids creadas a all_bids
                 all_bids.extend(host.make_bids(self))
+                bidders += 1
+        if prof is not None:
+            self._phase_start = prof.lap("bids", self._phase_start, calls=bidders, items=len(all_bids))
 
         approved_transactions = self.approve_bids(all_bids) #Creamos todas las transacciones
+        if prof is not None:
+            self._phase_start = prof.lap("approve", self._phase_start, calls=1, items=len(all_bids))
 
         if approved_transactions: # si hay una o mas transacciones las ejecutamos
             self.execute_transactions(approved_transactions)
+        if prof is not None:
+            self._phase_start = prof.lap("execute", self._phase_start, calls=1, items=len(approved_transactions))
 
         return approved_transactions # devolvemos las transacciones aprovadas
 
@@ -147,16 +191,138 @@ class City:
     def iterate(self):
         """Avanza la simulación un paso (mes)."""
         self.step += 1
+        prof = self.profiler
+        if prof is not None:
+            self._phase_start = prof.start(self.step)
 
         # 1. Actualizar Ocupación/Demanda
         for place in self.places.values():
             place.update_occupancy()
+        if prof is not None:
+            self._phase_start = prof.lap("occupancy", self._phase_start, calls=len(self.places))
 
         # 2. Actualizar Ganancias (antes de pujar)
+        observers = self.observers
         for host in self.hosts.values():
-            host.update_profits(self)
+            earnings = host.update_profits(self)
+            for observer in observers:
+                observer.on_profit_update(self, host.host_id, earnings)
+        if prof is not None:
+            self._phase_start = prof.lap("profits", self._phase_start, calls=len(self.hosts))
 
         # 3. Limpiar el Mercado (Bids y Transactions)
         transactions = self.clear_market()
 
-        return transactions
\ No newline at end of file
+        for observer in observers:
+            observer.on_step(self, transactions)
+
+        return transactions
+
+    # METODO 6
+    def fast_forward(self, max_steps):
+        """
+        Avanza de golpe los meses siguientes en los que ningún host puede pagar ningún place
+        de su frontera (como mucho max_steps), con los mismos sorteos, ganancias y avisos a
+        los observadores que iterate (con places y hosts ya al día en cada aviso).
+        Devuelve cuántos meses ha avanzado (ver quiescence.py).
+        """
+        if max_steps <= 0:
+            return 0
+        prof = self.profiler
+        if prof is not None:
+            self._phase_start = prof.start(self.step + 1)
+
+        # Estado de places y hosts como arrays (los ids son 0..n-1, en orden)
+        places = list(self.places.values())
+        hosts = list(self.hosts.values())
+        n = len(places)
+        rate = np.fromiter((place.rate for place in places), dtype=np.float64, count=n)
+        area = np.fromiter((place.area for place in places), dtype=np.int64, count=n)
+        owner = np.fromiter((place.host_id for place in places), dtype=np.int64, count=n)
+        ask_price = np.fromiter((place.get_ask_price() for place in places), dtype=np.float64, count=n)
+        rng = StreamBank.from_keys(np.fromiter((place.rng.key for place in places), dtype=np.uint64, count=n))
+        counters = np.fromiter((place.rng.counter for place in places), dtype=np.int64, count=n)
+        profits = np.fromiter((host.profits for host in hosts), dtype=np.float64, count=len(hosts))
+
+        v1 = ()
+        if self.is_v1_active:
+            v1 = (area, np.fromiter((host.area_of_origin for host in hosts), dtype=np.int64, count=len(hosts)))
+        edge_src, edge_dst = self.neighbor_index.edges()
+        thresholds = bid_thresholds(owner, ask_price, edge_src, edge_dst, len(hosts), *v1)
+        area_means = np.array([self.get_area_avg_rate(a) for a in range(int(area.max()) + 1)])
+        above_mean = rate > area_means[area]
+
+        host_ids = np.arange(len(hosts))
+        start = self.step
+        observers = self.observers
+        for month_occupancy, month_earnings in quiet_months(rng, counters, rate, above_mean, owner, profits,
+                                                            thresholds, max_steps):
+            last = len(month_earnings) - 1
+            for month, (occupancy, host_earnings) in enumerate(zip(month_occupancy, month_earnings)):
+                self.step += 1
+                profits += host_earnings
+                # Los observadores pueden consultar places y hosts en sus avisos: con observadores
+                # el estado se actualiza cada mes, sin ellos basta con el del último mes del bloque
+                if observers or month == last:
+                    self._set_quiet_state(places, hosts, occupancy, counters + (self.step - start), profits)
+                for observer in observers:
+                    observer.on_profit_update_batch(self, host_ids, host_earnings)
+                for observer in observers:
+                    observer.on_step(self, [])
+
+        if prof is not None and self.step > start:
+            # Solo los saltos de verdad: calls = meses avanzados (ver PhaseProfiler.totals)
+            self._phase_start = prof.lap("fast_forward", self._phase_start, calls=self.step - start)
+        return self.step - start
+
+    # METODO AUXILIAR
+    def _set_quiet_state(self, places, hosts, occupancy, counters, profits):
+        """Ocupación, contador de sorteos y fondos de places y hosts tras un mes de fast_forward."""
+        for place, place_occupancy, counter in zip(places, occupancy.tolist(), counters.tolist()):
+            place.occupancy = place_occupancy
+            place.rng.counter = counter
+        for host, host_profits in zip(hosts, profits.tolist()):
+            host.profits = host_profits
+
+    def advance(self, steps, fast_forward=True):
+        """
+        Avanza la simulación `steps` meses. Con fast_forward, después de cada mes sin ventas
+        (mercado parado) salta de golpe los meses en que sigue sin haber ofertas posibles.
+        """
+        end = self.step + steps
+        while self.step < end:
+            if not self.iterate() and fast_forward:
+                self.fast_forward(end - self.step)
+
+    # METODO DE CONSULTA
+    def get_average_ask_price(self):
+        """Precio de venta medio de todos los places."""
+        all_prices = [place.get_ask_price() for place in self.places.values()]
+        return sum(all_prices) / len(all_prices) if all_prices else 0.0
+
+    def get_place_table(self):
+        """Devuelve un dict de listas con place_id, area, host_id y ask_price de cada place."""
+        places = self.places.values()
+        return {
+            'place_id': [place.place_id for place in places],
+            'area': [place.area for place in places],
+            'host_id': [place.host_id for place in places],
+            'ask_price': [place.get_ask_price() for place in places],
+        }
+
+    def get_host_wealth(self):
+        """Devuelve un dict de listas con host_id, wealth (ganancias + valor de los assets) y area_of_origin."""
+        wealth_data = {'host_id': [], 'wealth': [], 'area_of_origin': []}
+
+        for host_id, host in self.hosts.items():
+            # Suma el precio de venta más reciente de todas las propiedades
+            total_assets_value = 0
+            for place_id in host.assets:
+                total_assets_value += self.places[place_id].get_ask_price()
+
+            # Riqueza = Ganancias + Valor de los Activos
+            wealth_data['host_id'].append(host_id)
+            wealth_data['wealth'].append(host.profits + total_assets_value)
+            wealth_data['area_of_origin'].append(host.area_of_origin)
+
+        return wealth_data
@@ -0,0 +1,61 @@
+# src/final_project/columnar.py
+"""
+Ficheros columnares sencillos basados en .npz de NumPy (sin dependencias extra).
+
+Cada columna de una tabla se guarda como un array independiente dentro del .npz, así que
+se puede leer solo un subconjunto de columnas. Las columnas categóricas se guardan como
+códigos enteros (`<columna>.codes`) + categorías (`<columna>.categories`).
+"""
+
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+_CODES = ".codes"
+_CATEGORIES = ".categories"
+
+
+def write_columns(path, df):
+    """Guarda un DataFrame en `path` (.npz sin comprimir), una entrada por columna."""
+    arrays = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            arrays[name + _CODES] = column.cat.codes.to_numpy()
+            arrays[name + _CATEGORIES] = np.asarray(column.cat.categories, dtype=str)
+        else:
+            arrays[name] = column.to_numpy()
+
+    # Escribimos en un fichero temporal con nombre único y lo renombramos: un lector nunca ve
+    # un fichero a medias y varios procesos pueden escribir el mismo `path` a la vez
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npz")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def read_columns(path, columns=None):
+    """Lee un fichero escrito con write_columns. `columns` limita las columnas que se cargan."""
+    with np.load(path, allow_pickle=False) as data:
+        names = []
+        for key in data.files:
+            name = key[:-len(_CODES)] if key.endswith(_CODES) else key
+            if not key.endswith(_CATEGORIES) and name not in names:
+                names.append(name)
+        if columns is not None:
+            names = [name for name in names if name in columns]
+
+        frame = {}
+        for name in names:
+            if name + _CODES in data.files:
+                frame[name] = pd.Categorical.from_codes(data[name + _CODES], categories=data[name + _CATEGORIES])
+            else:
+                frame[name] = data[name]
+    return pd.DataFrame(frame)
@@ -0,0 +1,96 @@
+# src/final_project/concentration.py
+"""
+Concentración de la propiedad en Inside Airbnb (Parte 2) para muchas ciudades y fechas.
+
+Los hosts se clasifican según cuántos listings tienen:
+    1 (Particular) | 2-4 (Small investor) | 5-19 (Medium business) | 20+ (Large landlord)
+y para cada snapshot se calcula el % de listings que pertenece a cada categoría.
+
+run_pipeline procesa N ficheros listings.csv.gz a la vez en un pool de procesos y devuelve
+una única tabla "tidy" con una fila por (city, date, category).
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .listings import DEFAULT_ROOM_TYPE, load_listings
+
+HOST_CATEGORIES = [
+    "1 (Particular)",
+    "2-4 (Small investor)",
+    "5-19 (Medium business)",
+    "20+ (Large landlord)",
+]
+# Límite inferior de cada categoría (nº de listings del host)
+CATEGORY_LOWER_BOUNDS = np.array([1, 2, 5, 20])
+
+TIDY_COLUMNS = ['city', 'date', 'category', 'hosts', 'listings', 'share']
+
+
+def categorize_hosts(listing_counts):
+    """
+    Clasifica a cada host según su nº de listings, sin apply fila a fila.
+    Devuelve una Series categórica (con el mismo índice si `listing_counts` es una Series).
+    """
+    counts = np.asarray(listing_counts)
+    codes = np.searchsorted(CATEGORY_LOWER_BOUNDS, counts, side='right') - 1
+    categories = pd.Categorical.from_codes(codes, categories=HOST_CATEGORIES)
+    index = listing_counts.index if isinstance(listing_counts, pd.Series) else None
+    return pd.Series(categories, index=index, name='category')
+
+
+def concentration_table(df):
+    """
+    Para un DataFrame de listings (con columna host_id) devuelve, por categoría de host,
+    el nº de hosts, el nº de listings y el % de listings (share). Incluye las categorías vacías.
+    """
+    host_ids = df['host_id'].to_numpy()
+    _, listing_counts = np.unique(host_ids, return_counts=True)
+    codes = np.searchsorted(CATEGORY_LOWER_BOUNDS, listing_counts, side='right') - 1
+
+    n_categories = len(HOST_CATEGORIES)
+    hosts = np.bincount(codes, minlength=n_categories)
+    listings = np.bincount(codes, weights=listing_counts, minlength=n_categories).astype(np.int64)
+    total = listings.sum()
+    share = listings / total * 100 if total else np.zeros(n_categories)
+
+    return pd.DataFrame({
+        'category': pd.Categorical(HOST_CATEGORIES, categories=HOST_CATEGORIES, ordered=True),
+        'hosts': hosts,
+        'listings': listings,
+        'share': share,
+    })
+
+
+def process_source(source):
+    """
+    Procesa un snapshot {'city', 'date', 'path'} (y opcionalmente 'room_type' / 'use_cache')
+    y devuelve sus filas de la tabla tidy.
+    """
+    df = load_listings(source['path'], room_type=source.get('room_type', DEFAULT_ROOM_TYPE),
+                       columns=('id', 'host_id', 'room_type'), use_cache=source.get('use_cache', True))
+    table = concentration_table(df)
+    table.insert(0, 'city', source['city'])
+    table.insert(1, 'date', source['date'])
+    return table[TIDY_COLUMNS]
+
+
+def run_pipeline(sources, max_workers=None):
+    """
+    Procesa todos los snapshots en un pool de procesos (max_workers=1: en este proceso)
+    y devuelve una tabla tidy con las columnas TIDY_COLUMNS, ordenada por ciudad y fecha.
+    """
+    sources = list(sources)
+    if max_workers == 1 or len(sources) <= 1:
+        tables = [process_source(source) for source in sources]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            tables = list(pool.map(process_source, sources))
+
+    if not tables:
+        return pd.DataFrame(columns=TIDY_COLUMNS)
+    result = pd.concat(tables, ignore_index=True)
+    result['category'] = pd.Categorical(result['category'], categories=HOST_CATEGORIES, ordered=True)
+    return result.sort_values(['city', 'date', 'category'], ignore_index=True)
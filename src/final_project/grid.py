@@ -0,0 +1,45 @@
+# src/final_project/grid.py
+"""
+Estado inicial de toda la grid calculado de una vez con NumPy (lo usan City y ArrayCity).
+
+    grid_areas     -> área (cuadrante 0-3) de cada place según su fila y columna
+    initial_rates  -> tarifa inicial de cada place: un sorteo uniforme en el rango de su área
+                      (primer número del flujo de cada place, ver rng.py) o tarifas dadas
+
+El precio inicial de venta de cada place es siempre tarifa * INITIAL_PRICE_FACTOR.
+"""
+
+import numpy as np
+
+INITIAL_PRICE_FACTOR = 900
+
+
+def grid_areas(size):
+    """Área de cada place de una grid size x size: 0 arriba-izq., 1 arriba-der., 2 abajo-izq., 3 abajo-der."""
+    place_ids = np.arange(size * size, dtype=np.int64)
+    rows = place_ids // size
+    cols = place_ids % size
+    mid = size // 2
+    return (rows >= mid).astype(np.int8) * 2 + (cols >= mid).astype(np.int8)
+
+
+def initial_rates(area, area_rates, rng, rates=None):
+    """
+    Tarifas iniciales (int64) de todos los places.
+
+    Sin `rates`, se sortea una tarifa uniforme en area_rates[área] con el StreamBank `rng`.
+    Con `rates` (un array con una tarifa por place) se usan esas tarifas; el sorteo de la
+    tarifa se da igualmente por hecho, así los sorteos de ocupación de cada mes son los
+    mismos que con tarifas uniformes.
+    """
+    if rates is None:
+        areas = range(max(area_rates) + 1)
+        min_rates = np.array([area_rates[a][0] for a in areas])[area]
+        max_rates = np.array([area_rates[a][1] for a in areas])[area]
+        return rng.randint(min_rates, max_rates)
+
+    rates = np.asarray(rates)
+    if rates.shape != area.shape:
+        raise ValueError(f"Se esperaban {len(area)} tarifas, no {rates.shape}")
+    rng.counter += 1
+    return np.rint(rates).astype(np.int64)
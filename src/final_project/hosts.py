@@ -1,6 +1,14 @@
 # src/final_project/hosts.py
 
+from types import MappingProxyType
+
+
 class Host:
+    # __slots__ + assets compactos: al final de la simulación casi todos los hosts tienen
+    # 0 o 1 places, así que no merece la pena un dict de assets y otro de frontera para cada uno
+    # (ver benchmarks/bench_memory.py)
+    __slots__ = ('host_id', 'city', 'profits', 'area', '_assets', '_frontier', 'area_of_origin')
+
     def __init__(self, host_id, place, city):
         self.host_id = host_id
         self.city = city
@@ -8,11 +16,100 @@ class Host:
         
         # place es un OBJETO Place
         self.area = place.area
-        self.assets = {place.place_id}
+
+        # Assets según cuántos places tiene el host:
+        #   0  -> None
+        #   1  -> el place_id (un int)
+        #   2+ -> dict {place_id: None} (assets devuelve su vista de claves, de solo lectura)
+        self._assets = place.place_id
+
+        # Frontera: {place_id: nº de assets propios vecinos} de los places NO propios
+        # que tocan alguno de mis assets. Se actualiza solo cuando cambia la propiedad,
+        # así make_bids no tiene que recorrer todos los assets y sus 8 vecinos cada mes.
+        # Solo se guarda con 2+ assets: con uno, la frontera son sus vecinos (ver frontier).
+        self._frontier = None
 
         # Para Graph 1:
         self.area_of_origin = place.area
 
+    @property
+    def assets(self):
+        """
+        place_id de los assets del host, siempre de solo lectura: () si no tiene, (place_id,)
+        si tiene uno o una vista (sin copia) de los internos si tiene varios. Para cambiarlos,
+        add_asset / remove_asset, que también mantienen al día la frontera.
+        """
+        assets = self._assets
+        if assets is None:
+            return ()
+        if isinstance(assets, dict):
+            return assets.keys()
+        return (assets,)
+
+    @property
+    def frontier(self):
+        """
+        {place_id: nº de assets propios vecinos} de los places no propios que tocan algún asset
+        (de solo lectura con 2+ assets: es una vista de la frontera interna).
+        """
+        assets = self._assets
+        if assets is None:
+            return {}
+        if isinstance(assets, dict):
+            return MappingProxyType(self._frontier)
+        return dict.fromkeys(self.city.neighbor_index.neighbors(assets), 1)
+
+    def add_asset(self, place_id):
+        """Añade un place a los assets del host y actualiza su frontera."""
+        assets = self._assets
+        if assets is None:
+            self._assets = place_id
+            return
+        if not isinstance(assets, dict):
+            if assets == place_id:
+                return
+            # Pasa a tener varios assets: a partir de ahora se guardan el dict y la frontera
+            self._frontier = dict.fromkeys(self.city.neighbor_index.neighbors(assets), 1)
+            assets = self._assets = {assets: None}
+
+        frontier = self._frontier
+        assets[place_id] = None
+        frontier.pop(place_id, None) # ya es propio: deja de ser oportunidad
+        for neighbor_id in self.city.neighbor_index.neighbors(place_id):
+            if neighbor_id not in assets:
+                frontier[neighbor_id] = frontier.get(neighbor_id, 0) + 1
+
+    def remove_asset(self, place_id):
+        """Quita un place de los assets del host y actualiza su frontera."""
+        assets = self._assets
+        if not isinstance(assets, dict):
+            if assets is None or assets != place_id:
+                raise KeyError(place_id)
+            self._assets = None
+            return
+
+        frontier = self._frontier
+        del assets[place_id]
+        own_neighbors = 0
+        for neighbor_id in self.city.neighbor_index.neighbors(place_id):
+            if neighbor_id in assets:
+                own_neighbors += 1
+            else:
+                # El vecino estaba en la frontera gracias (también) a este place
+                count = frontier[neighbor_id] - 1
+                if count:
+                    frontier[neighbor_id] = count
+                else:
+                    del frontier[neighbor_id]
+        # Si sigo teniendo algún vecino del place vendido, pasa a ser una oportunidad
+        if own_neighbors:
+            frontier[place_id] = own_neighbors
+
+        # Con un solo asset volvemos a la forma compacta (la frontera se deduce de sus vecinos)
+        if len(assets) == 1:
+            self._assets = next(iter(assets))
+            self._frontier = None
+
     def update_profits(self, city):
         """Actualiza los fondos del host con las ganancias mensuales de sus listings."""
         total_earnings = 0.0
@@ -26,21 +123,21 @@ class Host:
                 # Es lo mismo que: total_earnings = total_earnings + place.get_monthly_earnings()
 
         self.profits += total_earnings ## Actualizamos el profit con el total acumulado de cada vivienda
+        return total_earnings ## Devolvemos las ganancias del mes (para los observadores de la ciudad)
 
     def make_bids(self, city):
         """Genera una lista de ofertas para adquirir propiedades adyacentes."""
         bids = [] # lista vacia que almacenará las ofertas que hará el host
-        opportunities = set() # Conjunto vacio de oportunidades
 
         # 1. Identificar Oportunidades
-        for my_place_id in self.assets: ## para cada propiedad que tengo...
-            if my_place_id in city.places:
-                my_place = city.places[my_place_id] #recupero el objeto al que hace referencia el Place a partir de su identificador
-                for neighbor_id in my_place.neighbors: ## Para cada una de las celdas de alrededor de mi Place...
-                    neighbor_place = city.places[neighbor_id] # recupero el Place vecino a partir de su identificador
-                    # Oportunidad: vecino que NO es propiedad de este host
-                    if neighbor_place.host_id != self.host_id:
-                        opportunities.add(neighbor_id) # Añadimos el identificador del Place vecino al conjunto de oportunidades
+        # Son los places de la frontera (vecinos no propios de mis assets). Se recorren
+        # ordenados por place_id para que el orden de las ofertas (y el desempate del
+        # matching, ver matching.py) no dependa del orden interno del diccionario.
+        assets = self._assets
+        if assets is None or isinstance(assets, dict):
+            opportunities = sorted(self.frontier)
+        else: # con un solo asset, la frontera son sus vecinos
+            opportunities = sorted(city.neighbor_index.neighbors(assets))
 
         # 2. Crear Ofertas
         for pid in opportunities: # Para cada identificador que esta en el conjunto de oportunidades...
@@ -0,0 +1,120 @@
+# src/final_project/listings.py
+"""
+Lectura de los ficheros listings.csv.gz de Inside Airbnb para el análisis de la Parte 2.
+
+load_listings lee el .csv.gz por bloques (chunks), solo con las columnas necesarias y
+filtrando room_type mientras lee, así nunca se carga el fichero completo en memoria.
+El resultado (room_type categórico, ids como enteros compactos) se guarda en una caché
+columnar (ver columnar.py) cuyo nombre depende del hash del fichero original: las
+siguientes lecturas del mismo fichero son casi instantáneas.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+import pandas as pd
+
+from .columnar import read_columns, write_columns
+from .rng import StreamBank, stream_keys
+
+DEFAULT_COLUMNS = ('id', 'host_id', 'room_type')
+DEFAULT_ROOM_TYPE = "Entire home/apt"
+CACHE_VERSION = 1
+# Primer id de los flujos aleatorios de sample_rates (los places usan los ids 0..n-1)
+RATE_STREAM_OFFSET = 1 << 40
+
+
+def file_hash(path, block_size=1 << 20):
+    """Hash SHA-256 del contenido de un fichero (leído por bloques)."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def parse_price(prices):
+    """Convierte precios como "$1,234.00" en float32 (NaN si faltan)."""
+    cleaned = prices.astype("string").str.replace(r"[$,]", "", regex=True)
+    return pd.to_numeric(cleaned, errors="coerce").astype(np.float32)
+
+
+def _compact(df):
+    """room_type como categoría e ids con el tipo entero más pequeño posible."""
+    for name in ('id', 'host_id'):
+        if name in df:
+            df[name] = pd.to_numeric(df[name].astype(np.int64), downcast='integer')
+    if 'room_type' in df:
+        df['room_type'] = df['room_type'].astype('category')
+    return df
+
+
+def _read_csv(path, columns, room_type, chunksize):
+    """Lee el .csv.gz por bloques, aplicando el filtro de room_type y quitando host_id vacíos."""
+    chunks = []
+    usecols = list(dict.fromkeys(list(columns) + (['room_type'] if room_type else [])))
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunksize,
+                             dtype={'room_type': 'category', 'price': 'string'}):
+        if room_type:
+            chunk = chunk[chunk['room_type'] == room_type]
+        chunk = chunk.dropna(subset=['host_id'])
+        if 'price' in chunk:
+            chunk['price'] = parse_price(chunk['price'])
+        chunks.append(chunk[list(columns)])
+
+    if not chunks:
+        return pd.DataFrame(columns=list(columns))
+    # Cada bloque puede tener categorías distintas: las unificamos como texto y después _compact
+    df = pd.concat([chunk.astype({'room_type': str}) if 'room_type' in chunk else chunk for chunk in chunks],
+                   ignore_index=True)
+    return _compact(df)
+
+
+def load_listings(path, room_type=DEFAULT_ROOM_TYPE, columns=DEFAULT_COLUMNS,
+                  use_cache=True, cache_dir=None, chunksize=50_000):
+    """
+    Carga un listings.csv.gz con solo las columnas `columns`, los listings del tipo
+    `room_type` (None = todos) y sin host_id vacíos.
+
+    Con use_cache=True el resultado se guarda (y se busca) en `cache_dir` (por defecto, la
+    carpeta "cache" junto al fichero) con un nombre que incluye el hash del fichero y las
+    opciones de lectura, así que un fichero nuevo nunca reutiliza una caché antigua.
+    """
+    columns = tuple(columns)
+    if not use_cache:
+        return _read_csv(path, columns, room_type, chunksize)
+
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), "cache")
+    options = f"{CACHE_VERSION}|{room_type}|{','.join(columns)}"
+    key = hashlib.sha256((file_hash(path) + options).encode()).hexdigest()[:20]
+    name = os.path.basename(path).split(".")[0]
+    cache_path = os.path.join(cache_dir, f"{name}-{key}.npz")
+
+    if os.path.exists(cache_path):
+        return read_columns(cache_path)
+
+    df = _read_csv(path, columns, room_type, chunksize)
+    write_columns(cache_path, df)
+    return df
+
+
+def sample_rates(prices, n, seed=42):
+    """
+    Sortea n tarifas nocturnas (enteros) de la distribución empírica de `prices`, por ejemplo
+    la columna price de load_listings(..., columns=('host_id', 'price')), para usarlas en
+    City.initialize(rates=...) o ArrayCity.initialize(rates=...). Los precios vacíos o <= 0
+    se ignoran. La tarifa i solo depende de (seed, i) y no del orden de las filas.
+
+    El sorteo no tiene en cuenta el área del place: todas las tarifas salen de la misma
+    distribución (la de toda la ciudad del fichero).
+    """
+    values = np.asarray(prices, dtype=np.float64)
+    values = np.sort(values[np.isfinite(values) & (values > 0)])
+    if len(values) == 0:
+        raise ValueError("No hay precios válidos de los que sortear tarifas")
+    # Flujos propios (ids desde RATE_STREAM_OFFSET), independientes de los flujos de los
+    # places, que dan el sorteo uniforme de la tarifa y los de ocupación (ver rng.py)
+    draws = StreamBank.from_keys(stream_keys(seed, RATE_STREAM_OFFSET + np.arange(n))).randint(0, len(values) - 1)
+    return np.rint(values[draws]).astype(np.int64)
@@ -0,0 +1,124 @@
+# src/final_project/matching.py
+"""
+Motor de emparejamiento de ofertas (bids) para el clearing mensual del mercado.
+
+Regla greedy de City.approve_bids:
+    1. Las ofertas se recorren de mayor a menor 'spread'.
+    2. Un place se vende como mucho una vez al mes y un host compra como mucho una vez al mes.
+    3. Solo se aprueba la oferta si el comprador todavía tiene fondos (profits >= bid_price).
+
+Desempate: a igual 'spread' gana la oferta que se presentó antes, es decir, la que
+aparece antes en la lista (o en los arrays) de ofertas. Es el mismo orden que daba la
+versión con pandas (ordenación descendente que respeta el orden original).
+Como City genera las ofertas por host_id y, dentro de cada host, por place_id (y ArrayCity
+en el mismo orden), a igual spread gana el menor (buyer_id, place_id).
+"""
+
+from operator import itemgetter
+
+import numpy as np
+
+# Si una ronda aprueba menos de esta fracción de las ofertas que quedan, el resto se
+# empareja con el recorrido secuencial (ver match_bid_arrays)
+MIN_ROUND_FRACTION = 0.01
+
+
+def match_bids(bids, hosts):
+    """
+    Aprueba ofertas en forma de diccionario (como las que genera Host.make_bids).
+
+    `hosts` es el diccionario {host_id: Host} de la ciudad, que se usa para comprobar
+    los fondos del comprador. Devuelve la lista de diccionarios aprobados, en orden de aprobación.
+    """
+    # sorted es estable también con reverse=True: los empates conservan el orden de llegada
+    ordered_bids = sorted(bids, key=itemgetter('spread'), reverse=True)
+
+    approved_transactions = []
+    sold_places = set()
+    buyers_who_bought = set()
+
+    for bid in ordered_bids:
+        place_id = bid['place_id']
+        buyer_id = bid['buyer_id']
+        if place_id in sold_places or buyer_id in buyers_who_bought:
+            continue
+
+        buyer = hosts.get(buyer_id)
+        if buyer and buyer.profits >= bid['bid_price']:
+            approved_transactions.append(bid)
+            sold_places.add(place_id)
+            buyers_who_bought.add(buyer_id)
+
+    return approved_transactions
+
+
+def match_bid_arrays(place_ids, buyer_ids, spreads, bid_prices, budgets):
+    """
+    Versión con arrays de NumPy (una posición por oferta) de la misma regla greedy.
+
+    `budgets[buyer_id]` son los fondos actuales de cada host. Devuelve los índices de las
+    ofertas aprobadas, en el mismo orden en que las aprobaría el recorrido greedy.
+
+    En lugar de recorrer las ofertas una a una, se hacen rondas: en cada ronda se aprueban
+    las ofertas que son las de mayor prioridad tanto de su place como de su comprador
+    (el recorrido greedy las aprobaría seguro) y se descartan las que compiten con ellas.
+    El resultado es idéntico al del recorrido secuencial.
+
+    En el peor caso (por ejemplo, una cadena de ofertas en la que cada comprador compite con
+    el siguiente por un place) cada ronda solo aprueba una oferta. Cuando una ronda aprueba
+    menos de MIN_ROUND_FRACTION de las ofertas que quedan, las restantes (que ya están
+    ordenadas por prioridad) se recorren una a una, como en match_bids.
+    """
+    place_ids = np.asarray(place_ids)
+    buyer_ids = np.asarray(buyer_ids)
+    if len(place_ids) == 0:
+        return np.zeros(0, dtype=np.int64)
+
+    # Las ofertas sin fondos nunca se aprueban ni bloquean a otras: se quitan al principio
+    candidates = np.flatnonzero(np.asarray(budgets)[buyer_ids] >= np.asarray(bid_prices))
+    # Prioridad = posición tras ordenar por spread descendente (estable -> desempate por orden de llegada)
+    order = candidates[np.argsort(-np.asarray(spreads)[candidates], kind="stable")]
+    priority = np.empty(len(place_ids), dtype=np.int64)
+    priority[order] = np.arange(len(order))
+
+    alive_places = place_ids[order]
+    alive_buyers = buyer_ids[order]
+    approved = []
+
+    while len(order):
+        # Primera aparición (= mayor prioridad) de cada place y de cada comprador
+        _, first_place = np.unique(alive_places, return_index=True)
+        _, first_buyer = np.unique(alive_buyers, return_index=True)
+        winners = np.intersect1d(first_place, first_buyer, assume_unique=True)
+        approved.append(order[winners])
+        if len(winners) < MIN_ROUND_FRACTION * len(order):
+            approved.append(_match_sequential(order, alive_places, alive_buyers,
+                                              alive_places[winners], alive_buyers[winners]))
+            break
+
+        # Descartamos las ofertas cuyo place o comprador ya está cerrado
+        keep = ~(np.isin(alive_places, alive_places[winners]) | np.isin(alive_buyers, alive_buyers[winners]))
+        order, alive_places, alive_buyers = order[keep], alive_places[keep], alive_buyers[keep]
+
+    if not approved:
+        return np.zeros(0, dtype=np.int64)
+    approved = np.concatenate(approved)
+    # Devolvemos las aprobadas en orden de prioridad (el orden del recorrido greedy)
+    return approved[np.argsort(priority[approved])]
+
+
+def _match_sequential(order, place_ids, buyer_ids, sold_places, buyers_who_bought):
+    """
+    Recorrido greedy de las ofertas `order` (ya ordenadas por prioridad y con fondos) con sus
+    place_ids y buyer_ids. sold_places y buyers_who_bought: los ya cerrados antes del recorrido.
+    """
+    sold_places = set(sold_places.tolist())
+    buyers_who_bought = set(buyers_who_bought.tolist())
+    approved = []
+    for index, place_id, buyer_id in zip(order.tolist(), place_ids.tolist(), buyer_ids.tolist()):
+        if place_id in sold_places or buyer_id in buyers_who_bought:
+            continue
+        approved.append(index)
+        sold_places.add(place_id)
+        buyers_who_bought.add(buyer_id)
+    return np.array(approved, dtype=np.int64)
@@ -0,0 +1,222 @@
+# src/final_project/metrics.py
+"""
+Observadores de la simulación y colectores de métricas incrementales.
+
+Una ciudad (City o ArrayCity) avisa a sus observadores (city.add_observer) en estos puntos:
+    on_start(city)                                   -> después de initialize()
+    on_profit_update(city, host_id, earnings)        -> ganancias mensuales de un host
+    on_profit_update_batch(city, host_ids, earnings) -> lo mismo, para todos los hosts a la vez
+    on_transaction(city, tx, previous_price)         -> después de ejecutar una venta
+    on_step(city, transactions)                      -> al final de cada mes
+
+Los colectores mantienen agregados al día con esos avisos, sin recorrer todos los places
+ni todos los hosts en cada paso, y escriben una fila por mes en un "sink":
+    ListSink   -> lista en memoria (por defecto)
+    ArraySink  -> array de NumPy reservado de antemano
+    CSVSink    -> fichero CSV en disco, para ejecuciones largas
+"""
+
+import csv
+
+import numpy as np
+
+
+# ------------------------------------------------------------------
+# SINKS
+# ------------------------------------------------------------------
+
+class ListSink:
+    """Guarda las filas en una lista en memoria."""
+
+    def __init__(self):
+        self.rows = []
+
+    def append(self, row):
+        self.rows.append(row)
+
+    def close(self):
+        pass
+
+
+class ArraySink:
+    """Guarda las filas en un array de NumPy (n_rows x n_cols) reservado de antemano."""
+
+    def __init__(self, n_rows, n_cols):
+        self.data = np.full((n_rows, n_cols), np.nan)
+        self.n = 0
+
+    def append(self, row):
+        self.data[self.n] = row
+        self.n += 1
+
+    @property
+    def rows(self):
+        return self.data[:self.n]
+
+    def close(self):
+        pass
+
+
+class CSVSink:
+    """Escribe cada fila en un fichero CSV a medida que llega (no guarda nada en memoria)."""
+
+    def __init__(self, path, header):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(header)
+
+    def append(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+# ------------------------------------------------------------------
+# CONCENTRACIÓN
+# ------------------------------------------------------------------
+
+def gini(values):
+    """
+    Índice de Gini de `values` (0 = reparto igualitario, cerca de 1 = todo para uno).
+    Con un array 2D se calcula uno por fila. Devuelve 0 si no hay valores o suman 0.
+    """
+    values = np.sort(np.asarray(values, dtype=np.float64), axis=-1)
+    n = values.shape[-1]
+    if n == 0:
+        return 0.0 if values.ndim == 1 else np.zeros(values.shape[:-1])
+    totals = values.sum(axis=-1)
+    weighted = values @ (2 * np.arange(1, n + 1) - n - 1)
+    result = np.where(totals != 0, weighted / (n * np.where(totals != 0, totals, 1)), 0.0)
+    return float(result) if result.ndim == 0 else result
+
+
+# ------------------------------------------------------------------
+# OBSERVADORES
+# ------------------------------------------------------------------
+
+class Observer:
+    """Observador base: todos los avisos están vacíos, se sobrescriben los que hagan falta."""
+
+    def on_start(self, city):
+        pass
+
+    def on_profit_update(self, city, host_id, earnings):
+        pass
+
+    def on_profit_update_batch(self, city, host_ids, earnings):
+        for host_id, amount in zip(host_ids, earnings):
+            self.on_profit_update(city, host_id, amount)
+
+    def on_transaction(self, city, tx, previous_price):
+        pass
+
+    def on_step(self, city, transactions):
+        pass
+
+
+class AveragePriceCollector(Observer):
+    """
+    Precio de venta medio de la ciudad y de cada área, mantenido con sumas acumuladas.
+    Cada mes escribe la fila [step, precio medio, precio medio área 0, área 1, ...].
+    """
+
+    def __init__(self, sink=None):
+        self.sink = sink if sink is not None else ListSink()
+        self.total = 0.0
+        self.count = 0
+        self.area_totals = None
+        self.area_counts = None
+        self.place_area = None
+
+    def on_start(self, city):
+        table = city.get_place_table()
+        self.place_area = np.asarray(table['area'], dtype=np.int64)
+        prices = np.asarray(table['ask_price'], dtype=np.float64)
+        self.total = float(prices.sum())
+        self.count = len(prices)
+        n_areas = max(city.area_rates) + 1
+        self.area_totals = np.bincount(self.place_area, weights=prices, minlength=n_areas)
+        self.area_counts = np.bincount(self.place_area, minlength=n_areas)
+
+    def on_transaction(self, city, tx, previous_price):
+        delta = tx['bid_price'] - previous_price
+        self.total += delta
+        self.area_totals[self.place_area[tx['place_id']]] += delta
+
+    def on_step(self, city, transactions):
+        area_means = self.area_totals / np.maximum(self.area_counts, 1)
+        self.sink.append([city.step, self.average()] + area_means.tolist())
+
+    def average(self):
+        """Precio de venta medio actual."""
+        return self.total / self.count if self.count else 0.0
+
+    def history(self):
+        """Lista con el precio medio de cada mes registrado (no disponible con CSVSink)."""
+        return [float(row[1]) for row in self.sink.rows]
+
+
+class WealthCollector(Observer):
+    """
+    Riqueza (ganancias + valor de los assets) de cada host, mantenida de forma incremental,
+    y concentración del mercado:
+        - HHI de la propiedad (suma de las cuotas de places al cuadrado), al día en O(1) por venta.
+        - Índice de Gini de la riqueza, calculado cada `gini_every` meses (0 = solo bajo demanda).
+    Cada mes escribe la fila [step, riqueza total, HHI, Gini (o NaN)].
+    """
+
+    def __init__(self, sink=None, gini_every=0):
+        self.sink = sink if sink is not None else ListSink()
+        self.gini_every = gini_every
+        self.wealth = None
+        self.asset_counts = None
+        self.area_of_origin = None
+        self.sum_sq_assets = 0
+        self.n_places = 0
+
+    def on_start(self, city):
+        table = city.get_host_wealth()
+        self.wealth = np.array(table['wealth'], dtype=np.float64)
+        self.area_of_origin = np.asarray(table['area_of_origin'])
+        owners = np.asarray(city.get_place_table()['host_id'], dtype=np.int64)
+        self.asset_counts = np.bincount(owners, minlength=len(self.wealth))
+        self.sum_sq_assets = int((self.asset_counts ** 2).sum())
+        self.n_places = len(owners)
+
+    def on_profit_update(self, city, host_id, earnings):
+        self.wealth[host_id] += earnings
+
+    def on_profit_update_batch(self, city, host_ids, earnings):
+        self.wealth[host_ids] += earnings
+
+    def on_transaction(self, city, tx, previous_price):
+        # El comprador cambia dinero por un place valorado al mismo precio: su riqueza no cambia.
+        # El vendedor cobra bid_price y pierde un place que valía previous_price.
+        self.wealth[tx['seller_id']] += tx['bid_price'] - previous_price
+        for host_id, change in ((tx['seller_id'], -1), (tx['buyer_id'], 1)):
+            count = self.asset_counts[host_id]
+            self.sum_sq_assets += (count + change) ** 2 - count ** 2
+            self.asset_counts[host_id] = count + change
+
+    def on_step(self, city, transactions):
+        gini = np.nan
+        if self.gini_every and city.step % self.gini_every == 0:
+            gini = self.gini()
+        self.sink.append([city.step, float(self.wealth.sum()), self.hhi(), gini])
+
+    def hhi(self):
+        """Índice Herfindahl-Hirschman de la propiedad de places (1/n_places = reparto igualitario, 1 = monopolio)."""
+        return self.sum_sq_assets / self.n_places ** 2 if self.n_places else 0.0
+
+    def gini(self):
+        """Índice de Gini de la riqueza actual de los hosts."""
+        return gini(self.wealth)
+
+    def to_dict(self):
+        """Tabla de riqueza con el mismo formato que City.get_host_wealth."""
+        return {
+            'host_id': np.arange(len(self.wealth)),
+            'wealth': self.wealth.copy(),
+            'area_of_origin': self.area_of_origin,
+        }
@@ -0,0 +1,52 @@
+# src/final_project/neighbors.py
+"""
+Índice de vecinos de la grid en formato CSR (compressed sparse row).
+
+En lugar de que cada Place guarde su propia lista de vecinos, la ciudad construye una
+única vez dos arrays compartidos:
+    offsets[p] : offsets[p + 1]  -> posiciones de los vecinos de p dentro de indices
+    indices                      -> place_id de los vecinos, en el orden de NEIGHBOR_OFFSETS
+"""
+
+from array import array
+
+import numpy as np
+
+# Desplazamientos (fila, columna) de los 8 vecinos; este orden fija el de las ofertas de cada host
+NEIGHBOR_OFFSETS = [(-1, 0), (1, 0), (0, -1), (0, 1), (-1, -1), (1, 1), (-1, 1), (1, -1)]
+
+
+class NeighborIndex:
+    """Vecinos (8 direcciones) de todos los places de una grid size x size, construidos de una vez."""
+
+    def __init__(self, size):
+        self.size = size
+        n = size * size
+        place_ids = np.arange(n, dtype=np.int64)
+        rows, cols = place_ids // size, place_ids % size
+
+        # Matriz (n, 8) con -1 donde el vecino cae fuera de la grid
+        table = np.full((n, len(NEIGHBOR_OFFSETS)), -1, dtype=np.int64)
+        for k, (dr, dc) in enumerate(NEIGHBOR_OFFSETS):
+            r, c = rows + dr, cols + dc
+            valid = (r >= 0) & (r < size) & (c >= 0) & (c < size)
+            table[valid, k] = r[valid] * size + c[valid]
+
+        valid = table >= 0
+        counts = valid.sum(axis=1)
+        offsets = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(counts, out=offsets[1:])
+
+        # array('q') para que al iterar se obtengan ints de Python (no np.int64)
+        self.offsets = array('q', offsets.tobytes())
+        self.indices = array('q', table[valid].tobytes())
+
+    def neighbors(self, place_id):
+        """Devuelve los place_id vecinos de place_id (un array de solo lectura por convención)."""
+        return self.indices[self.offsets[place_id]:self.offsets[place_id + 1]]
+
+    def edges(self):
+        """Devuelve dos arrays de NumPy (src, dst) con una fila por par de vecinos."""
+        offsets = np.frombuffer(self.offsets, dtype=np.int64)
+        src = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+        return src, np.frombuffer(self.indices, dtype=np.int64)
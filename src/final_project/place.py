@@ -1,61 +1,45 @@
 # src/final_project/place.py
 
-import random
+from .price_history import PriceHistory
+from .rng import PlaceRandom
 
 class Place:
+    # __slots__: sin __dict__ por instancia (ver benchmarks/bench_memory.py)
+    __slots__ = ('place_id', 'host_id', 'city', '_rate', 'area', 'price_history', 'ask_price', 'occupancy', 'rng')
+
     #Atributos de la clase
-    def __init__(self, place_id, host_id, city):
+    def __init__(self, place_id, host_id, city, rng=None):
         self.place_id = place_id
         self.host_id = host_id
         self.city = city
-        self.rate = 0          # Tarifa nocturna
+        self._rate = 0         # Tarifa nocturna (ver la propiedad rate)
         self.area = 0          # Área (0, 1, 2, o 3)
-        self.neighbors = []    # Lista de place_id de los vecinos
-        self.price_history = {0: 0} # {step: ask_price}
+        # Historial compacto {step: ask_price}; su tamaño lo limita city.price_history_limit
+        self.price_history = PriceHistory(city.price_history_limit if city is not None else None)
+        self.ask_price = 0     # Precio de venta actual (el más reciente del historial)
+        self.price_history[0] = 0
         self.occupancy = 0.0     # Ocupación mensual (0.0 a 1.0)
-
-    def setup(self, grid_size, area_rates):
-        """Calcula el área, tarifa inicial, precio inicial y vecinos del lugar."""
-
-        # 1. Determinar el Área
-        row = self.place_id // grid_size
-        col = self.place_id % grid_size
-        mid = grid_size // 2
-
-        if row < mid and col < mid:      self.area = 0 # Top-Left
-        elif row < mid and col >= mid:   self.area = 1 # Top-Right
-        elif row >= mid and col < mid:   self.area = 2 # Bottom-Left
-        else:                            self.area = 3 # Bottom-Right
-
-        # 2. Determinar Tarifa (Rate) y Precio Inicial (Ask Price)
-        # Obtenemos primero el rango de precios de la area en la que se encuentra el Place
-        min_rate, max_rate = area_rates[self.area]
-         # Asigna un numero aleatorio dentro de ese rango
-        # randint.(limite_inf, limite_sup) genera un numero aleatorio entre los limites que le digas
-        self.rate = random.randint(min_rate, max_rate)
-
-        # Precio de venta inicial (900 veces la tarifa)
-        initial_ask_price = self.rate * 900
-        self.price_history[0] = initial_ask_price
-
-        # 3. Determinar Vecinos (Neighbors) - Movimientos en cruz
-        # A partir de la ciudad obetenemos el tamaño de la grid
-        grid = self.city.size
-        r, c = row, col
-
-        potential_neighbors = [(r - 1, c), (r + 1, c), (r, c - 1), (r, c + 1), (r - 1,c - 1), (r + 1, c + 1), (r - 1, c + 1), (r + 1, c - 1)]
-
-        # Un bucle que se encagar de mirar en todas las 8 direcciones
-        for next_r, next_c in potential_neighbors:
-            # Aqui comprueba que las celdas adyacentes sean validas, es decir,
-            #que ninguna celda esté fuera de la grid.
-            if 0 <= next_r < grid and 0 <= next_c < grid:
-                 # Aqui calcula el identificador del vecino. Es la operacion inversa a
-                # calcaular la fila y columna de un place_id.
-                neighbor_id = next_r * grid + next_c
-
-                # Añade identificador del vecino al la lista de vecinos
-                self.neighbors.append(neighbor_id)
+        # Generador aleatorio propio, derivado de la seed de la ciudad y del place_id
+        # (City.initialize lo pasa ya creado a partir de las claves de toda la grid)
+        self.rng = rng if rng is not None else PlaceRandom(city.seed if city is not None else 0, place_id)
+
+    @property
+    def rate(self):
+        """Tarifa nocturna del Place."""
+        return self._rate
+
+    @rate.setter
+    def rate(self, value):
+        # Avisamos a la ciudad para que mantenga al día la suma de tarifas del área
+        old_rate = self._rate
+        self._rate = value
+        if self.city is not None:
+            self.city.on_rate_change(self, old_rate)
+
+    @property
+    def neighbors(self):
+        """place_id de los vecinos, leídos del índice CSR compartido de la ciudad."""
+        return self.city.neighbor_index.neighbors(self.place_id)
 
     def update_occupancy(self):
         #Consultamos el la tarifa del Place
@@ -66,9 +50,9 @@ class Place:
 
         #Establecemos los días según el enunciado
         if nightly_rate > mean_area_rate:
-            self.occupancy = random.randint(5,15)
+            self.occupancy = self.rng.randint(5,15)
         else:
-            self.occupancy = random.randint(10,20)
+            self.occupancy = self.rng.randint(10,20)
 
     def calculate_demand(self):
         """
@@ -88,7 +72,12 @@ class Place:
         """Calcula la ganancia mensual (tarifa * ocupación)"""
         return self.rate * self.occupancy
 
+    def record_price(self, step, price):
+        """Registra un nuevo precio de venta y lo convierte en el precio actual."""
+        self.ask_price = price
+        self.price_history[step] = price
+
     def get_ask_price(self):
         """Devuelve el precio de venta (ask_price) más reciente."""
-        # Obtiene la clave más grande (el paso de tiempo más reciente)
-        return self.price_history[max(self.price_history.keys())]
\ No newline at end of file
+        # Se guarda aparte, así que no hace falta buscar el último step del historial
+        return self.ask_price
\ No newline at end of file
@@ -0,0 +1,257 @@
+# src/final_project/plots.py
+"""
+Gráficos de la simulación (antes en main.py) y cola para dibujarlos en segundo plano.
+
+generate_graph1 elige la forma del gráfico de riqueza según el nº de hosts:
+    "bars"      -> una barra por host (el gráfico original), hasta GRAPH1_MAX_BARS hosts
+    "quantiles" -> hosts ordenados por riqueza y agrupados en `bins` grupos del mismo tamaño:
+                   altura = riqueza media del grupo, color = reparto por área de origen
+    "lorenz"    -> curva de Lorenz de la riqueza (total y por área de origen) con su Gini
+Con mode="auto" se usa "bars" hasta GRAPH1_MAX_BARS hosts y "quantiles" por encima.
+
+RenderQueue dibuja gráficos en un pool de procesos con el backend no interactivo Agg, así que
+la simulación (o el siguiente escenario de un sweep) no espera a matplotlib:
+
+    with RenderQueue() as renders:
+        renders.submit(generate_graph1, wealth_df)
+        renders.submit(generate_graph2, history, version=0)
+    # al salir del with, todos los ficheros están escritos
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+import matplotlib.pyplot as plt
+import numpy as np
+
+from .metrics import gini
+
+AREA_COLORS = {0: '#3498db', 1: '#2ecc71', 2: '#e74c3c', 3: '#f39c12'}
+GRAPH1_MAX_BARS = 2000
+GRAPH1_MODES = ("auto", "bars", "quantiles", "lorenz")
+
+
+def _save(filename, label):
+    """Guarda y cierra la figura actual y devuelve su nombre de fichero."""
+    plt.tight_layout()
+    os.makedirs(os.path.dirname(filename) or ".", exist_ok=True)
+    plt.savefig(filename)
+    print(f" {label} guardado en {filename}")
+    plt.close()
+    return filename
+
+
+def _area_legend():
+    handles = [plt.Rectangle((0,0),1,1, color=AREA_COLORS[area]) for area in AREA_COLORS]
+    labels = [f'Area {area}' for area in AREA_COLORS]
+    plt.legend(handles, labels, title='Área de Origen', fontsize=12)
+
+
+def generate_graph1(wealth_df, filename="reports/graph1.png", mode="auto", bins=100, max_bars=GRAPH1_MAX_BARS):
+    """
+    Genera el gráfico de riqueza total de los hosts al final de la simulación.
+    `mode`: "auto", "bars", "quantiles" o "lorenz" (ver el docstring del módulo).
+    """
+    if mode not in GRAPH1_MODES:
+        raise ValueError(f"mode debe ser uno de {GRAPH1_MODES}, no {mode!r}")
+    if mode == "auto":
+        mode = "bars" if len(wealth_df) <= max_bars else "quantiles"
+
+    if mode == "bars":
+        return _graph1_bars(wealth_df, filename)
+    wealth = np.asarray(wealth_df['wealth'], dtype=np.float64)
+    areas = np.asarray(wealth_df['area_of_origin'], dtype=np.int64)
+    if mode == "quantiles":
+        return _graph1_quantiles(wealth, areas, filename, bins)
+    return _graph1_lorenz(wealth, areas, filename)
+
+
+def _graph1_bars(wealth_df, filename):
+    """
+    Genera el gráfico de barras vertical de riqueza total de los hosts.
+    - Altura: Riqueza total.
+    - Color: Área de origen.
+    - Orden: De menor a mayor riqueza.
+    """
+    
+    # 1. Ordenar por riqueza
+    wealth_df = wealth_df.sort_values(by='wealth').reset_index(drop=True)
+    
+    # 2. Definir colores para las áreas
+    colors = AREA_COLORS
+    bar_colors = [colors[area] for area in wealth_df['area_of_origin']]
+    
+    plt.figure(figsize=(20, 10)) # Un tamaño más grande para 100 barras
+    
+    # 3. Graficar
+    plt.bar(wealth_df['host_id'].astype(str), wealth_df['wealth'], color=bar_colors)
+    
+    plt.title('Total Wealth of Hosts at the End of the Simulation', fontsize=16)
+    plt.xlabel('Host ID (Sorted by Wealth)', fontsize=14)
+    plt.ylabel('Total Wealth (Profits + Asset Value)', fontsize=14)
+    
+    # 4. Leyenda para los colores de las áreas
+    _area_legend()
+    
+    # Reducir ticks del eje X para mejor visualización
+    n = len(wealth_df)
+    tick_positions = np.arange(0, n, max(1, n // 20)) # Mostrar máximo 20 ticks
+    plt.xticks(tick_positions, wealth_df['host_id'].iloc[tick_positions].astype(str), rotation=90, fontsize=8)
+    
+    return _save(filename, "Gráfico 1")
+
+
+def quantile_bins(wealth, areas, bins=100):
+    """
+    Ordena los hosts por riqueza y los reparte en `bins` grupos consecutivos del mismo tamaño.
+    Devuelve (riqueza media de cada grupo, matriz (bins, áreas) con la fracción de hosts de cada área).
+    """
+    n = len(wealth)
+    bins = max(1, min(bins, n))
+    order = np.argsort(wealth, kind="stable")
+    group = np.arange(n) * bins // n  # grupo de cada host en el orden de riqueza
+    counts = np.bincount(group, minlength=bins)
+    mean_wealth = np.bincount(group, weights=wealth[order], minlength=bins) / counts
+
+    n_areas = max(AREA_COLORS) + 1
+    area_counts = np.bincount(group * n_areas + areas[order], minlength=bins * n_areas).reshape(bins, n_areas)
+    return mean_wealth, area_counts / counts[:, None]
+
+
+def lorenz_curve(wealth):
+    """Puntos (fracción de hosts, fracción de riqueza) de la curva de Lorenz y el índice de Gini."""
+    values = np.sort(np.asarray(wealth, dtype=np.float64))
+    n = len(values)
+    total = values.sum()
+    shares = np.concatenate([[0.0], np.cumsum(values) / total]) if total > 0 else np.linspace(0, 1, n + 1)
+    population = np.linspace(0, 1, n + 1)
+    return population, shares, gini(values)
+
+
+def _graph1_quantiles(wealth, areas, filename, bins):
+    """Barras por grupos de riqueza: altura = riqueza media, segmentos = reparto por área de origen."""
+    mean_wealth, area_shares = quantile_bins(wealth, areas, bins)
+    positions = np.arange(len(mean_wealth))
+
+    plt.figure(figsize=(20, 10))
+    bottom = np.zeros(len(mean_wealth))
+    for area, color in AREA_COLORS.items():
+        heights = mean_wealth * area_shares[:, area]
+        plt.bar(positions, heights, bottom=bottom, width=1.0, color=color, edgecolor='none')
+        bottom += heights
+
+    plt.title(f'Total Wealth of Hosts at the End of the Simulation ({len(wealth)} hosts, {len(positions)} quantile bins)',
+              fontsize=16)
+    plt.xlabel('Hosts Grouped by Wealth (Poorest to Richest)', fontsize=14)
+    plt.ylabel('Mean Total Wealth (Profits + Asset Value)', fontsize=14)
+    _area_legend()
+
+    # Una marca por decil (el último grupo de cada 10 %)
+    tick_positions = np.unique((np.arange(1, 11) * len(positions) + 9) // 10 - 1)
+    plt.xticks(tick_positions, [f'{100 * (p + 1) / len(positions):.0f}%' for p in tick_positions], fontsize=10)
+    return _save(filename, "Gráfico 1")
+
+
+def _graph1_lorenz(wealth, areas, filename):
+    """Curva de Lorenz de la riqueza de todos los hosts y de los hosts de cada área de origen."""
+    plt.figure(figsize=(10, 10))
+    population, shares, gini = lorenz_curve(wealth)
+    plt.plot(population, shares, color='black', linewidth=2, label=f'All hosts (Gini {gini:.2f})')
+    for area, color in AREA_COLORS.items():
+        in_area = areas == area
+        if in_area.any():
+            population, shares, gini = lorenz_curve(wealth[in_area])
+            plt.plot(population, shares, color=color, label=f'Area {area} (Gini {gini:.2f})')
+    plt.plot([0, 1], [0, 1], color='grey', linestyle='--', linewidth=1, label='Perfect equality')
+
+    plt.title(f'Lorenz Curve of Host Wealth at the End of the Simulation ({len(wealth)} hosts)', fontsize=16)
+    plt.xlabel('Cumulative Share of Hosts (Sorted by Wealth)', fontsize=14)
+    plt.ylabel('Cumulative Share of Total Wealth', fontsize=14)
+    plt.legend(title='Área de Origen', fontsize=12)
+    plt.grid(True, alpha=0.5)
+    return _save(filename, "Gráfico 1")
+
+
+def generate_graph2(avg_price_history, version, filename_template="reports/graph2_v{}.png", bands=None):
+    """
+    Genera el gráfico adicional que muestra un aspecto interesante.
+    `bands` (opcional): resultado de replicas.summarize sobre el precio medio de muchas réplicas
+    ({'mean', 'percentiles': {p: serie}}); cada par de percentiles (p, 100 - p) se dibuja como una banda.
+    """
+    
+    filename = filename_template.format(version)
+    color = 'purple' if version == 0 else 'green'
+    
+    plt.figure(figsize=(10, 6))
+    months = range(1, len(avg_price_history) + 1)
+    if bands is not None:
+        percentiles = bands['percentiles']
+        lower = sorted(p for p in percentiles if p < 50 and 100 - p in percentiles)
+        for i, p in enumerate(lower):
+            # Las bandas más anchas, más transparentes
+            plt.fill_between(months, percentiles[p], percentiles[100 - p], color=color,
+                             alpha=0.15 + 0.15 * i, linewidth=0, label=f'Percentiles {p}-{100 - p}')
+        plt.plot(months, bands['mean'], color=color, linestyle='--', label='Media de las réplicas')
+    plt.plot(months, avg_price_history, 
+             label=f'V{version} Promedio de Precio', color=color)
+    
+    title = f'V{version}: Evolution of the Average Sale Price'
+    if version == 1:
+        title += ' (Modified Rule: Hosts Only Buy in Their Origin Area)'
+        
+    plt.title(title)
+    plt.xlabel('Time Step (Months)')
+    plt.ylabel('Average Sale Price')
+    plt.grid(True, alpha=0.5)
+    if bands is not None:
+        plt.legend()
+    
+    return _save(filename, f"Gráfico 2 V{version}")
+
+
+# ------------------------------------------------------------------
+# COLA DE RENDERIZADO
+# ------------------------------------------------------------------
+
+def _use_agg():
+    """Inicializador de los procesos de RenderQueue: backend sin ventanas."""
+    matplotlib.use("Agg")
+
+
+class RenderQueue:
+    """
+    Cola de gráficos que se dibujan en un pool de procesos con el backend Agg.
+    submit devuelve un Future; wait (o salir del `with`) espera a todos y devuelve sus resultados.
+    """
+
+    def __init__(self, max_workers=None):
+        self._pool = ProcessPoolExecutor(max_workers=max_workers, initializer=_use_agg)
+        self._futures = []
+
+    def submit(self, plot_function, *args, **kwargs):
+        """Encola plot_function(*args, **kwargs) (una función de este módulo u otra importable)."""
+        future = self._pool.submit(plot_function, *args, **kwargs)
+        self._futures.append(future)
+        return future
+
+    def wait(self):
+        """Espera a todos los gráficos encolados y devuelve sus resultados (relanza el primer error)."""
+        futures, self._futures = self._futures, []
+        return [future.result() for future in futures]
+
+    def close(self):
+        """Espera a los gráficos pendientes y cierra el pool."""
+        try:
+            return self.wait()
+        finally:
+            self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self._pool.shutdown(cancel_futures=True)
@@ -0,0 +1,117 @@
+# src/final_project/price_history.py
+"""
+Almacenamiento compacto de historiales de precios.
+
+- PriceHistory: historial de un Place como dos arrays tipados (steps, precios) de solo-añadir.
+  Se usa como un diccionario {step: precio}, pero ocupa 16 bytes por entrada.
+- PriceLog: registro columnar de todas las ventas de una ciudad (step, place_id, precio),
+  usado por ArrayCity.
+
+Ambos aceptan `max_entries`:
+    None -> se guarda todo el historial
+    K    -> solo se conservan las últimas K entradas
+    0    -> no se guarda historial (solo importa el precio actual)
+"""
+
+from array import array
+from bisect import bisect_left
+
+
+class PriceHistory:
+    """Historial (step, precio) de un Place, ordenado por step y con memoria acotada opcional."""
+
+    __slots__ = ('max_entries', 'steps', 'prices')
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self.steps = array('q')
+        self.prices = array('d')
+
+    def __setitem__(self, step, price):
+        """Añade (step, price). Si step es el último registrado, sobrescribe su precio."""
+        if self.max_entries == 0:
+            return
+        if self.steps and self.steps[-1] == step:
+            self.prices[-1] = price
+            return
+        if self.steps and step < self.steps[-1]:
+            raise ValueError(f"El historial es de solo-añadir: step {step} < {self.steps[-1]}")
+
+        self.steps.append(step)
+        self.prices.append(price)
+
+        # Recortamos de vez en cuando (al doblar el límite) para que el coste sea O(1) amortizado
+        if self.max_entries is not None and len(self.steps) >= 2 * self.max_entries:
+            del self.steps[:-self.max_entries]
+            del self.prices[:-self.max_entries]
+
+    def _start(self):
+        """Primera posición visible (las anteriores están pendientes de recortar)."""
+        if self.max_entries is None:
+            return 0
+        return max(0, len(self.steps) - self.max_entries)
+
+    def __getitem__(self, step):
+        start = self._start()
+        i = bisect_left(self.steps, step, start)
+        if i == len(self.steps) or self.steps[i] != step:
+            raise KeyError(step)
+        return self.prices[i]
+
+    def __contains__(self, step):
+        try:
+            self[step]
+        except KeyError:
+            return False
+        return True
+
+    def __len__(self):
+        return len(self.steps) - self._start()
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def keys(self):
+        return self.steps[self._start():].tolist()
+
+    def values(self):
+        return self.prices[self._start():].tolist()
+
+    def items(self):
+        return list(zip(self.keys(), self.values()))
+
+    def __repr__(self):
+        return f"PriceHistory({dict(self.items())})"
+
+
+class PriceLog:
+    """Registro columnar de solo-añadir con una fila (step, place_id, precio) por venta."""
+
+    def __init__(self, max_entries=None):
+        self.max_entries = max_entries
+        self.steps = array('q')
+        self.place_ids = array('q')
+        self.prices = array('d')
+
+    def append(self, step, place_id, price):
+        if self.max_entries == 0:
+            return
+        self.steps.append(step)
+        self.place_ids.append(place_id)
+        self.prices.append(price)
+        if self.max_entries is not None and len(self.steps) >= 2 * self.max_entries:
+            del self.steps[:-self.max_entries]
+            del self.place_ids[:-self.max_entries]
+            del self.prices[:-self.max_entries]
+
+    def _start(self):
+        if self.max_entries is None:
+            return 0
+        return max(0, len(self.steps) - self.max_entries)
+
+    def __len__(self):
+        return len(self.steps) - self._start()
+
+    def __iter__(self):
+        start = self._start()
+        return zip(self.steps[start:], self.place_ids[start:], self.prices[start:])
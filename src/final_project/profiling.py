@@ -0,0 +1,121 @@
+# src/final_project/profiling.py
+"""
+Instrumentación opcional por fases de City.iterate / ArrayCity.iterate.
+
+Fases de cada mes:
+    occupancy -> actualizar la ocupación de todos los places
+    profits   -> sumar las ganancias mensuales a los hosts
+    bids      -> generar las ofertas (make_bids)
+    approve   -> emparejar ofertas (approve_bids)
+    execute   -> ejecutar las transacciones aprobadas
+    fast_forward -> meses sin ofertas posibles avanzados de golpe (una fila por salto; calls = meses)
+
+Uso:
+    city.profiler = PhaseProfiler()        # None (por defecto) = sin instrumentación
+    ... city.iterate() ...
+    print(city.profiler.summary())
+    city.profiler.to_csv("reports/profile.csv")
+
+Sin profiler, la ciudad solo comprueba `if prof is not None` en cada fase.
+Con track_allocations=True también se mide la memoria reservada en cada fase (tracemalloc),
+a cambio de que la simulación vaya bastante más lenta.
+"""
+
+import csv
+import json
+import time
+import tracemalloc
+
+PHASES = ("occupancy", "profits", "bids", "approve", "execute", "fast_forward")
+# Fases cuyas filas cubren varios meses (tantos como `calls`)
+MULTI_MONTH_PHASES = ("fast_forward",)
+FIELDS = ("step", "phase", "seconds", "calls", "items", "alloc_bytes", "peak_bytes")
+
+
+class PhaseProfiler:
+    """Guarda una fila (step, fase, segundos, llamadas, elementos, memoria) por fase y mes."""
+
+    def __init__(self, track_allocations=False):
+        self.track_allocations = track_allocations
+        self.records = []
+        self.step = 0
+        self._memory = 0
+        if track_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def start(self, step):
+        """Empieza a medir el mes `step` y devuelve el instante inicial de la primera fase."""
+        self.step = step
+        if self.track_allocations:
+            tracemalloc.reset_peak()
+            self._memory = tracemalloc.get_traced_memory()[0]
+        return time.perf_counter()
+
+    def lap(self, phase, started, calls=0, items=0):
+        """
+        Cierra la fase `phase` (empezada en `started`) y devuelve el instante inicial de la siguiente.
+        `calls`: llamadas por objeto en la fase; `items`: ofertas o transacciones producidas.
+        """
+        now = time.perf_counter()
+        alloc_bytes = peak_bytes = 0
+        if self.track_allocations:
+            current, peak = tracemalloc.get_traced_memory()
+            alloc_bytes, peak_bytes = current - self._memory, peak - self._memory
+            tracemalloc.reset_peak()
+            self._memory = current
+        self.records.append({
+            'step': self.step, 'phase': phase, 'seconds': now - started,
+            'calls': calls, 'items': items, 'alloc_bytes': alloc_bytes, 'peak_bytes': peak_bytes,
+        })
+        return time.perf_counter()
+
+    # ------------------------------------------------------------------
+    # EXPORTAR
+    # ------------------------------------------------------------------
+
+    def to_json(self, path):
+        """Guarda la línea temporal completa como una lista JSON de filas."""
+        with open(path, "w") as f:
+            json.dump(self.records, f)
+
+    def to_csv(self, path):
+        """Guarda la línea temporal completa como CSV (una fila por step y fase)."""
+        with open(path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(self.records)
+
+    @classmethod
+    def from_records(cls, records):
+        """Crea un profiler con filas ya medidas (por ejemplo, devueltas por otro proceso)."""
+        profiler = cls()
+        profiler.records = list(records)
+        return profiler
+
+    def totals(self):
+        """Devuelve {fase: {'seconds', 'calls', 'items', 'peak_bytes', 'steps'}} sumando todos los meses (steps = meses medidos)."""
+        totals = {}
+        for record in self.records:
+            phase = totals.setdefault(record['phase'], {'seconds': 0.0, 'calls': 0, 'items': 0,
+                                                        'peak_bytes': 0, 'steps': 0})
+            phase['seconds'] += record['seconds']
+            phase['calls'] += record['calls']
+            phase['items'] += record['items']
+            phase['peak_bytes'] = max(phase['peak_bytes'], record['peak_bytes'])
+            # Cada fila es un mes, salvo las de fast_forward, que cubren `calls` meses
+            phase['steps'] += record['calls'] if record['phase'] in MULTI_MONTH_PHASES else 1
+        return totals
+
+    def summary(self):
+        """Tabla de texto con el tiempo total, el porcentaje y el coste medio por mes de cada fase."""
+        totals = self.totals()
+        total_time = sum(phase['seconds'] for phase in totals.values()) or 1.0
+        names = [p for p in PHASES if p in totals] + [p for p in totals if p not in PHASES]
+        width = max([len('fase')] + [len(name) for name in names])
+        lines = [f"{'fase':<{width}} {'total (s)':>10} {'%':>6} {'ms/mes':>9} {'llamadas':>10} {'elementos':>10} {'pico (KB)':>10}"]
+        for name in names:
+            phase = totals[name]
+            lines.append(f"{name:<{width}} {phase['seconds']:>10.3f} {100 * phase['seconds'] / total_time:>6.1f} "
+                         f"{1000 * phase['seconds'] / phase['steps']:>9.3f} {phase['calls']:>10} "
+                         f"{phase['items']:>10} {phase['peak_bytes'] / 1024:>10.1f}")
+        return "\n".join(lines)
@@ -0,0 +1,244 @@
+# src/final_project/replicas.py
+"""
+Modo Monte Carlo: R réplicas independientes de la misma ciudad simuladas a la vez.
+
+ReplicaCity guarda el estado de todas las réplicas en arrays 2D (réplicas x places) y avanza
+todas juntas con las mismas operaciones de NumPy que ArrayCity, así que el coste de Python por
+mes no depende de R. Cada réplica usa su propia seed (por defecto seed, seed + 1, ...) y da
+exactamente la misma simulación que ArrayCity (o City) con esa seed.
+
+Como ninguna réplica comparte places ni hosts con otra, las ofertas de todas las réplicas se
+emparejan de una vez con match_bid_arrays usando ids globales (réplica * n + id): la regla
+greedy no mezcla réplicas y el orden dentro de cada réplica es el de ArrayCity.
+
+run_replicas devuelve, para V0 o V1, la media y las bandas de percentiles del precio medio de
+venta de cada mes y de la distribución final de riqueza de los hosts.
+"""
+
+import numpy as np
+
+from .grid import INITIAL_PRICE_FACTOR, grid_areas, initial_rates
+from .matching import match_bid_arrays
+from .metrics import gini
+from .neighbors import NeighborIndex
+from .rng import StreamBank, stream_keys
+
+DEFAULT_PERCENTILES = (5, 25, 50, 75, 95)
+
+
+class ReplicaCity:
+    """
+    `n_replicas` copias de una ciudad size x size que solo se diferencian en la seed.
+    Los arrays de estado tienen forma (n_replicas, n_places); los de los hosts, (n_replicas, n_hosts).
+    """
+
+    def __init__(self, size, area_rates, seed=42, is_v1_active=False, n_replicas=100, seeds=None):
+        self.size = size
+        self.area_rates = area_rates
+        self.seeds = list(seeds) if seeds is not None else [seed + r for r in range(n_replicas)]
+        self.n_replicas = len(self.seeds)
+        self.is_v1_active = is_v1_active
+        self.step = 0
+
+        n = size * size
+        self.n_places = n
+        self.n_hosts = n
+        shape = (self.n_replicas, n)
+        # Un flujo aleatorio por (réplica, place): la fila r da los mismos sorteos que StreamBank(seeds[r], n)
+        self.rng = StreamBank.from_keys(np.stack([stream_keys(s, np.arange(n)) for s in self.seeds]))
+
+        # Lo que no depende de la réplica (la grid es la misma) se guarda una sola vez
+        self.area = np.zeros(n, dtype=np.int8)
+        self.area_of_origin = np.zeros(n, dtype=np.int8)
+
+        self.rate = np.zeros(shape, dtype=np.int64)
+        self.occupancy = np.zeros(shape, dtype=np.float64)
+        self.owner = np.zeros(shape, dtype=np.int64)
+        self.ask_price = np.zeros(shape, dtype=np.float64)
+        self.profits = np.zeros(shape, dtype=np.float64)
+
+        # Suma de precios de venta de cada réplica, actualizada con cada venta
+        # (igual que AveragePriceCollector, para obtener exactamente los mismos promedios)
+        self.price_totals = np.zeros(self.n_replicas, dtype=np.float64)
+
+        # Vecinos de la grid (índice CSR como arrays de NumPy), calculados en initialize
+        self.neighbor_offsets = np.zeros(1, dtype=np.int64)
+        self.neighbor_indices = np.zeros(0, dtype=np.int64)
+
+    # METODO 1
+    def initialize(self, rates=None):
+        """Asigna áreas, tarifas y precios iniciales de todas las réplicas (ver grid.py)."""
+        self.area = grid_areas(self.size)
+        self.area_of_origin = self.area.copy()
+
+        # Sin `rates`, cada réplica sortea sus tarifas; con `rates`, todas empiezan con las mismas
+        rate = initial_rates(self.area, self.area_rates, self.rng, rates)
+        self.rate = np.ascontiguousarray(np.broadcast_to(rate, (self.n_replicas, self.n_places)))
+        self.ask_price = self.rate * float(INITIAL_PRICE_FACTOR)
+        self.price_totals = self.ask_price.sum(axis=1)
+
+        self.owner = np.tile(np.arange(self.n_places, dtype=np.int64), (self.n_replicas, 1))
+        self.profits = np.zeros((self.n_replicas, self.n_hosts), dtype=np.float64)
+
+        neighbor_index = NeighborIndex(self.size)
+        self.neighbor_offsets = np.frombuffer(neighbor_index.offsets, dtype=np.int64)
+        self.neighbor_indices = np.frombuffer(neighbor_index.indices, dtype=np.int64)
+
+    def _flat(self, values):
+        """Índices (réplica, id) de un array (R, n) como posiciones en el array aplanado."""
+        return values + np.arange(self.n_replicas)[:, None] * values.shape[1]
+
+    # METODO AUXILIAR
+    def get_area_avg_rates(self):
+        """Array (réplicas, áreas) con la tarifa media de cada área (100 si un área está vacía)."""
+        n_areas = max(self.area_rates) + 1
+        index = np.arange(self.n_replicas)[:, None] * n_areas + self.area
+        sums = np.bincount(index.ravel(), weights=self.rate.ravel(),
+                           minlength=self.n_replicas * n_areas).reshape(self.n_replicas, n_areas)
+        counts = np.bincount(self.area, minlength=n_areas)
+        return np.where(counts > 0, sums / np.maximum(counts, 1), 100.0)
+
+    # METODO AUXILIAR
+    def update_occupancy(self):
+        """Sortea la ocupación de todos los places de todas las réplicas (como ArrayCity.update_occupancy)."""
+        area_means = np.take_along_axis(self.get_area_avg_rates(), np.broadcast_to(
+            self.area.astype(np.int64), self.rate.shape), axis=1)
+        above_mean = self.rate > area_means
+        draws = self.rng.randint(0, 10)
+        self.occupancy = np.where(above_mean, 5 + draws, 10 + draws).astype(np.float64)
+
+    # METODO AUXILIAR
+    def update_profits(self):
+        """Suma a cada host las ganancias de sus places, réplica a réplica."""
+        earnings = self.rate * self.occupancy
+        size = self.n_replicas * self.n_hosts
+        self.profits += np.bincount(self._flat(self.owner).ravel(), weights=earnings.ravel(),
+                                    minlength=size).reshape(self.profits.shape)
+
+    # METODO AUXILIAR
+    def make_bids(self):
+        """
+        Ofertas de todas las réplicas como arrays (réplica, place_id, seller_id, buyer_id, spread,
+        bid_price), ordenadas por réplica y, dentro de cada réplica, como en ArrayCity.
+        """
+        n = self.n_places
+
+        # Solo pueden pujar los hosts con fondos para el place más barato de su réplica: casi
+        # siempre son pocos, así que solo se recorren los vecinos de los places de esos hosts
+        can_bid = (self.profits > 0) & (self.profits >= self.ask_price.min(axis=1, keepdims=True))
+        replicas, sources = np.nonzero(can_bid.ravel()[self._flat(self.owner)])
+
+        # Aristas (place de origen -> vecino) de esos places, sacadas del índice CSR
+        starts = self.neighbor_offsets[sources]
+        counts = self.neighbor_offsets[sources + 1] - starts
+        first = np.cumsum(counts) - counts
+        targets = self.neighbor_indices[np.repeat(starts - first, counts) + np.arange(counts.sum())]
+        replicas = np.repeat(replicas, counts)
+        buyers = self.owner[replicas, np.repeat(sources, counts)]
+
+        budgets = self.profits[replicas, buyers]
+        mask = self.owner[replicas, targets] != buyers
+        mask &= budgets >= self.ask_price[replicas, targets]
+        if self.is_v1_active:
+            # Lógica V1: el host solo puede comprar en su área de origen
+            mask &= self.area[targets] == self.area_of_origin[buyers]
+
+        # Un host puede ser vecino del mismo place por varios de sus assets: quitamos duplicados
+        keys = np.unique((replicas[mask] * n + buyers[mask]) * n + targets[mask])
+        replicas = keys // (n * n)
+        buyers = keys // n % n
+        targets = keys % n
+
+        budgets = self.profits[replicas, buyers]
+        return (replicas, targets, self.owner[replicas, targets], buyers,
+                budgets - self.ask_price[replicas, targets], budgets)
+
+    # METODO 2
+    def approve_bids(self, bids):
+        """Regla greedy de approve_bids en todas las réplicas a la vez. Devuelve los índices aprobados."""
+        replicas, place_ids, _, buyer_ids, spreads, bid_prices = bids
+        offset = replicas * self.n_places
+        return match_bid_arrays(offset + place_ids, offset + buyer_ids, spreads, bid_prices, self.profits.ravel())
+
+    # METODO 3
+    def execute_transactions(self, bids, approved):
+        """
+        Aplica las ventas aprobadas. np.add.at suma en el orden de aprobación, así que los
+        fondos de cada host cambian en el mismo orden (y con el mismo redondeo) que en ArrayCity.
+        """
+        replicas, place_ids, seller_ids, buyer_ids, _, bid_prices = (values[approved] for values in bids)
+        offset = replicas * self.n_hosts
+
+        # Compra y venta de cada transacción intercaladas: [-comprador, +vendedor, -comprador, ...]
+        hosts = np.column_stack([offset + buyer_ids, offset + seller_ids]).ravel()
+        amounts = np.column_stack([-bid_prices, bid_prices]).ravel()
+        np.add.at(self.profits.reshape(-1), hosts, amounts)
+
+        np.add.at(self.price_totals, replicas, bid_prices - self.ask_price[replicas, place_ids])
+        self.owner[replicas, place_ids] = buyer_ids
+        self.ask_price[replicas, place_ids] = bid_prices
+
+    # METODO 5
+    def iterate(self):
+        """Avanza todas las réplicas un mes. Devuelve el nº de ventas de cada réplica."""
+        self.step += 1
+        self.update_occupancy()
+        self.update_profits()
+        bids = self.make_bids()
+        approved = self.approve_bids(bids)
+        if len(approved):
+            self.execute_transactions(bids, approved)
+        return np.bincount(bids[0][approved], minlength=self.n_replicas)
+
+    # METODOS DE CONSULTA
+    def get_average_ask_prices(self):
+        """Precio de venta medio de cada réplica (array de n_replicas)."""
+        return self.price_totals / self.n_places
+
+    def get_host_wealth(self):
+        """Array (réplicas, hosts) con la riqueza (ganancias + valor de los assets) de cada host."""
+        size = self.n_replicas * self.n_hosts
+        assets_value = np.bincount(self._flat(self.owner).ravel(), weights=self.ask_price.ravel(),
+                                   minlength=size).reshape(self.profits.shape)
+        return self.profits + assets_value
+
+
+def summarize(samples, percentiles=DEFAULT_PERCENTILES):
+    """Media y percentiles entre réplicas (eje 0) de un array (réplicas, ...)."""
+    return {
+        'mean': samples.mean(axis=0),
+        'percentiles': {p: np.percentile(samples, p, axis=0) for p in percentiles},
+    }
+
+
+def run_replicas(size, area_rates, steps, seed=42, is_v1_active=False, n_replicas=100, seeds=None,
+                 rates=None, percentiles=DEFAULT_PERCENTILES):
+    """
+    Simula n_replicas réplicas durante `steps` meses y devuelve un dict con:
+        seeds           -> seed de cada réplica
+        avg_price       -> array (réplicas, steps) con el precio medio de venta de cada mes
+        avg_price_bands -> media y percentiles del precio medio de cada mes (ver summarize)
+        wealth          -> array (réplicas, hosts) con la riqueza final de cada host
+        wealth_bands    -> media y percentiles de la riqueza ordenada: el punto k es la riqueza
+                           del host k-ésimo más pobre (la distribución final de riqueza)
+        gini            -> índice de Gini de la riqueza final de cada réplica
+    """
+    city = ReplicaCity(size, area_rates, seed, is_v1_active, n_replicas, seeds)
+    city.initialize(rates)
+
+    avg_price = np.empty((city.n_replicas, steps))
+    for step in range(steps):
+        city.iterate()
+        avg_price[:, step] = city.get_average_ask_prices()
+
+    wealth = city.get_host_wealth()
+    sorted_wealth = np.sort(wealth, axis=1)
+
+    return {
+        'seeds': city.seeds,
+        'avg_price': avg_price,
+        'avg_price_bands': summarize(avg_price, percentiles),
+        'wealth': wealth,
+        'wealth_bands': summarize(sorted_wealth, percentiles),
+        'gini': gini(wealth),
+    }
@@ -0,0 +1,188 @@
+# src/final_project/results.py
+"""
+Almacén columnar de resultados de simulaciones, particionado por escenario y seed.
+
+Estructura en disco (cada parte es un .npz de columnar.py):
+    <root>/<tabla>/scenario=<escenario>/seed=<seed>/part-00000.npz
+                                                   part-00001.npz ...
+
+Tablas que escribe sweep.run_scenario cuando la configuración tiene 'results':
+    steps        -> una fila por mes: step, precio medio, precio medio de cada área (AveragePriceCollector)
+    concentration-> una fila por mes: step, riqueza total, HHI, Gini (WealthCollector)
+    transactions -> una fila por venta: step, place_id, buyer_id, seller_id, price, previous_price
+    wealth       -> riqueza final: host_id, wealth, area_of_origin
+
+Las filas se acumulan en memoria (PartitionSink) y se escriben en bloques de `buffer_rows`,
+así que una ejecución larga no escribe un fichero por mes ni guarda todo en memoria.
+Para consultar, ResultsStore.read carga solo las particiones y columnas pedidas, y
+ResultsStore.iter_partitions las recorre una a una (para agregar miles de ejecuciones
+sin tenerlas todas en memoria a la vez).
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from .columnar import read_columns, write_columns
+from .metrics import Observer
+
+TRANSACTION_COLUMNS = ('step', 'place_id', 'buyer_id', 'seller_id', 'price', 'previous_price')
+CONCENTRATION_COLUMNS = ('step', 'total_wealth', 'hhi', 'gini')
+DEFAULT_BUFFER_ROWS = 50_000
+
+
+def step_columns(n_areas):
+    """Columnas de la tabla steps (filas de AveragePriceCollector)."""
+    return ('step', 'avg_price') + tuple(f'avg_price_area_{area}' for area in range(n_areas))
+
+
+def _is_part(name):
+    # Los ficheros temporales de write_columns también terminan en .npz
+    return name.startswith("part-") and name.endswith(".npz")
+
+
+def _is_integer_column(name):
+    return name == 'step' or name.endswith('_id')
+
+
+class PartitionSink:
+    """
+    Sink (ver metrics.py) que acumula filas y las escribe como partes de una partición.
+    close() escribe las filas que queden en el buffer.
+    """
+
+    def __init__(self, store, table, scenario, seed, columns, buffer_rows=DEFAULT_BUFFER_ROWS):
+        self.store = store
+        self.table = table
+        self.scenario = scenario
+        self.seed = seed
+        self.columns = tuple(columns)
+        self.buffer_rows = buffer_rows
+        self.buffer = []
+
+    def append(self, row):
+        self.buffer.append(row)
+        if len(self.buffer) >= self.buffer_rows:
+            self.flush()
+
+    def flush(self):
+        """Escribe el buffer como una parte nueva (si tiene filas)."""
+        if not self.buffer:
+            return
+        data = np.array(self.buffer, dtype=np.float64).reshape(len(self.buffer), len(self.columns))
+        frame = {}
+        for i, name in enumerate(self.columns):
+            # step y los ids se guardan como enteros; el resto, como float64
+            frame[name] = data[:, i].astype(np.int64) if _is_integer_column(name) else data[:, i]
+        self.store.write_part(self.table, self.scenario, self.seed, pd.DataFrame(frame))
+        self.buffer = []
+
+    def close(self):
+        self.flush()
+
+
+class TransactionLogger(Observer):
+    """Observador que guarda cada venta (step, place_id, buyer_id, seller_id, price, previous_price) en un sink."""
+
+    def __init__(self, sink):
+        self.sink = sink
+
+    def on_transaction(self, city, tx, previous_price):
+        self.sink.append((city.step, tx['place_id'], tx['buyer_id'], tx['seller_id'],
+                          tx['bid_price'], previous_price))
+
+
+class ResultsStore:
+    """Conjunto de tablas columnares particionadas por escenario y seed bajo el directorio `root`."""
+
+    def __init__(self, root):
+        self.root = root
+
+    # ------------------------------------------------------------------
+    # ESCRITURA
+    # ------------------------------------------------------------------
+
+    def partition_path(self, table, scenario, seed):
+        """Carpeta de la partición (table, scenario, seed)."""
+        if os.sep in str(scenario) or '=' in str(scenario):
+            raise ValueError(f"Nombre de escenario no válido: {scenario!r}")
+        return os.path.join(self.root, table, f"scenario={scenario}", f"seed={int(seed)}")
+
+    def write_part(self, table, scenario, seed, df):
+        """
+        Añade un DataFrame como una parte nueva de la partición. Cada partición la escribe
+        un solo proceso (ver sweep.prepare_results): el nº de parte sale de las que ya hay.
+        """
+        path = self.partition_path(table, scenario, seed)
+        os.makedirs(path, exist_ok=True)
+        n_parts = sum(1 for name in os.listdir(path) if _is_part(name))
+        write_columns(os.path.join(path, f"part-{n_parts:05d}.npz"), df)
+
+    def sink(self, table, scenario, seed, columns, buffer_rows=DEFAULT_BUFFER_ROWS):
+        """Devuelve un PartitionSink que escribe filas con `columns` en la partición."""
+        return PartitionSink(self, table, scenario, seed, columns, buffer_rows)
+
+    def clear(self, scenario, seed, tables=None):
+        """Borra la partición (scenario, seed) de `tables` (por defecto, de todas las tablas)."""
+        for table in tables if tables is not None else self.tables():
+            path = self.partition_path(table, scenario, seed)
+            if os.path.isdir(path):
+                shutil.rmtree(path)
+
+    # ------------------------------------------------------------------
+    # CONSULTA
+    # ------------------------------------------------------------------
+
+    def tables(self):
+        """Nombres de las tablas del almacén."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name for name in os.listdir(self.root) if os.path.isdir(os.path.join(self.root, name)))
+
+    def partitions(self, table, scenarios=None, seeds=None):
+        """Lista de (scenario, seed) de `table`, filtrada opcionalmente por escenarios y seeds."""
+        table_path = os.path.join(self.root, table)
+        if not os.path.isdir(table_path):
+            return []
+        result = []
+        for scenario_dir in sorted(os.listdir(table_path)):
+            scenario = scenario_dir.partition("=")[2]
+            if scenarios is not None and scenario not in scenarios:
+                continue
+            for seed_dir in sorted(os.listdir(os.path.join(table_path, scenario_dir))):
+                seed = int(seed_dir.partition("=")[2])
+                if seeds is None or seed in seeds:
+                    result.append((scenario, seed))
+        return sorted(result)
+
+    def read_partition(self, table, scenario, seed, columns=None):
+        """Lee todas las partes de una partición (solo `columns`, si se dan) en un DataFrame."""
+        path = self.partition_path(table, scenario, seed)
+        parts = [read_columns(os.path.join(path, name), columns)
+                 for name in sorted(os.listdir(path)) if _is_part(name)]
+        if not parts:
+            return pd.DataFrame(columns=list(columns or []))
+        return pd.concat(parts, ignore_index=True) if len(parts) > 1 else parts[0]
+
+    def iter_partitions(self, table, scenarios=None, seeds=None, columns=None):
+        """Genera (scenario, seed, DataFrame) partición a partición, sin cargar las demás."""
+        for scenario, seed in self.partitions(table, scenarios, seeds):
+            yield scenario, seed, self.read_partition(table, scenario, seed, columns)
+
+    def read(self, table, scenarios=None, seeds=None, columns=None):
+        """
+        Lee `table` en un único DataFrame con las columnas scenario y seed añadidas.
+        Solo se cargan las particiones de `scenarios` / `seeds` y las columnas `columns`.
+        """
+        frames = []
+        for scenario, seed, df in self.iter_partitions(table, scenarios, seeds, columns):
+            df.insert(0, 'scenario', scenario)
+            df.insert(1, 'seed', seed)
+            frames.append(df)
+        if not frames:
+            return pd.DataFrame(columns=['scenario', 'seed'] + list(columns or []))
+        result = pd.concat(frames, ignore_index=True)
+        result['scenario'] = result['scenario'].astype('category')
+        return result
@@ -0,0 +1,107 @@
+# src/final_project/rng.py
+"""
+Generadores aleatorios con semilla propia para cada ciudad y cada Place.
+
+En vez de usar el módulo global `random` (compartido por todas las ciudades), cada Place
+tiene su propio flujo de números aleatorios derivado de (seed de la ciudad, place_id).
+El flujo es "basado en contador": el n-ésimo número del flujo se calcula directamente
+con una función hash (SplitMix64) de (clave del flujo, n), sin estado oculto.
+
+Esto permite:
+    - ejecutar varias ciudades a la vez (en hilos o procesos) sin que se mezclen sus sorteos,
+    - que el motor de objetos (PlaceRandom) y el de arrays (StreamBank) den exactamente
+      los mismos números para el mismo (seed, place_id, n).
+"""
+
+import numpy as np
+
+MASK64 = 0xFFFFFFFFFFFFFFFF
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def _mix64(z):
+    """Función de mezcla de SplitMix64 sobre enteros de Python (64 bits)."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK64
+    return z ^ (z >> 31)
+
+
+def _mix64_array(z):
+    """La misma mezcla sobre arrays de np.uint64 (la multiplicación da la vuelta en 64 bits)."""
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def stream_key(seed, stream_id):
+    """Clave del flujo número `stream_id` de la ciudad con semilla `seed`."""
+    return _mix64((_mix64(seed & MASK64) + stream_id * GOLDEN_GAMMA) & MASK64)
+
+
+def stream_keys(seed, stream_ids):
+    """Versión vectorizada de stream_key para un array de stream_ids."""
+    ids = np.asarray(stream_ids, dtype=np.uint64)
+    return _mix64_array(np.uint64(_mix64(seed & MASK64)) + ids * np.uint64(GOLDEN_GAMMA))
+
+
+class PlaceRandom:
+    """Flujo aleatorio propio de un Place: el n-ésimo sorteo solo depende de (seed, place_id, n)."""
+
+    __slots__ = ('key', 'counter')
+
+    def __init__(self, seed, stream_id, counter=0):
+        self.key = stream_key(seed, stream_id)
+        self.counter = counter  # número de sorteos ya hechos
+
+    @classmethod
+    def from_key(cls, key, counter=0):
+        """Flujo con la clave ya calculada (por ejemplo, con stream_keys para toda la grid)."""
+        rng = cls.__new__(cls)
+        rng.key = key
+        rng.counter = counter
+        return rng
+
+    def randint(self, a, b):
+        """Entero aleatorio en [a, b], como random.randint."""
+        x = _mix64((self.key + (self.counter + 1) * GOLDEN_GAMMA) & MASK64)
+        self.counter += 1
+        return a + x % (b - a + 1)
+
+
+class StreamBank:
+    """
+    Muchos flujos (uno por Place) que avanzan a la vez, para el motor de arrays.
+    El flujo i de un StreamBank da los mismos números que PlaceRandom(seed, i).
+    """
+
+    def __init__(self, seed, n_streams, counter=0):
+        self.keys = stream_keys(seed, np.arange(n_streams))
+        self.counter = counter  # sorteos ya hechos por cada flujo
+
+    @classmethod
+    def from_keys(cls, keys, counter=0):
+        """Flujos con las claves ya calculadas (por ejemplo, solo los de un trozo de la grid)."""
+        bank = cls.__new__(cls)
+        bank.keys = np.asarray(keys, dtype=np.uint64)
+        bank.counter = counter
+        return bank
+
+    def randint(self, a, b):
+        """Un entero en [a, b] por flujo (a y b pueden ser escalares o arrays)."""
+        x = _mix64_array(self.keys + np.uint64(((self.counter + 1) * GOLDEN_GAMMA) & MASK64))
+        self.counter += 1
+        span = (np.asarray(b, dtype=np.int64) - np.asarray(a, dtype=np.int64) + 1).astype(np.uint64)
+        return np.asarray(a, dtype=np.int64) + (x % span).astype(np.int64)
+
+    def randint_at(self, a, b, counters):
+        """
+        Sorteos de randint(a, b) con el contador de cada flujo en `counters` (acceso directo,
+        sin cambiar self.counter). `counters` se combina con las claves por broadcasting:
+        con counters de forma (m, 1) se obtienen los m sorteos siguientes de todos los flujos.
+        """
+        # atleast_1d: con un escalar, NumPy avisaría del desbordamiento (buscado) de la multiplicación
+        counters = np.asarray(counters, dtype=np.uint64)
+        offsets = (np.atleast_1d(counters) + np.uint64(1)) * np.uint64(GOLDEN_GAMMA)
+        x = _mix64_array(self.keys + offsets.reshape(counters.shape))
+        span = (np.asarray(b, dtype=np.int64) - np.asarray(a, dtype=np.int64) + 1).astype(np.uint64)
+        return np.asarray(a, dtype=np.int64) + (x % span).astype(np.int64)
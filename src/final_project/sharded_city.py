@@ -0,0 +1,215 @@
+# src/final_project/sharded_city.py
+"""
+Motor de arrays repartido en varios procesos (descomposición del dominio por bandas de filas).
+
+La grid se divide en `n_workers` bandas de filas contiguas (place_id de lo a hi) y cada banda
+la lleva un proceso. El estado de la ciudad (áreas, tarifas, propietarios, precios, fondos...)
+vive en memoria compartida (multiprocessing.shared_memory), así que cada proceso ve las filas
+vecinas de su banda (el "halo" que necesitan las ofertas) sin copiar nada.
+
+Las tarifas no cambian después de initialize, así que la tarifa media de cada área se calcula
+una sola vez y cada proceso recibe al arrancar qué places de su banda están por encima de ella.
+
+Cada mes:
+    1. Cada proceso sortea la ocupación de su banda (mismos flujos aleatorios que ArrayCity)
+       y la escribe en el array compartido.
+    2. El proceso principal suma las ganancias de cada host (como ArrayCity).
+    3. Cada proceso genera las ofertas de las aristas que salen de su banda (comprador = dueño
+       del place de la banda, objetivo = vecino, quizá de la banda de al lado).
+    4. El proceso principal junta las ofertas de todas las bandas (un host puede llegar al
+       mismo place desde assets de dos bandas: se quitan duplicados), aplica la misma regla
+       greedy global de approve_bids (una compra por host y una venta por place al mes)
+       y ejecuta las transacciones en orden.
+
+Las ofertas resultantes y su orden son exactamente los de ArrayCity, y las ganancias son
+sumas de enteros (exactas en float64), así que la simulación da los mismos
+resultados que ArrayCity y City con la misma seed, sea cual sea el nº de procesos.
+
+save_snapshot guarda una ShardedCity como una ArrayCity (mismo estado) y load_snapshot la
+devuelve como ArrayCity.
+
+Hay que cerrar la ciudad (close() o `with ShardedCity(...) as city:`) para parar los procesos
+y liberar la memoria compartida; si no, se hace al destruir el objeto o al salir del programa.
+"""
+
+import multiprocessing as mp
+import os
+import weakref
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .array_city import ArrayCity
+from .rng import StreamBank, stream_keys
+
+# Arrays que se mueven a memoria compartida después de ArrayCity.initialize
+SHARED_ARRAYS = ('area', 'rate', 'occupancy', 'owner', 'ask_price', 'profits', 'area_of_origin',
+                 'edge_src', 'edge_dst')
+
+
+def _attach(spec):
+    """Abre los bloques de memoria compartida de `spec` y devuelve (bloques, {nombre: array})."""
+    blocks, arrays = [], {}
+    for name, (shm_name, dtype, shape) in spec.items():
+        block = shared_memory.SharedMemory(name=shm_name)
+        blocks.append(block)
+        arrays[name] = np.ndarray(shape, dtype=dtype, buffer=block.buf)
+    return blocks, arrays
+
+
+def _worker(conn, spec, seed, area_avg_rates, lo, hi):
+    """Bucle de un proceso: atiende las órdenes del proceso principal sobre los places [lo, hi)."""
+    blocks, arrays = _attach(spec)
+    try:
+        n_places = len(arrays['area'])
+        # Places de la banda con tarifa por encima de la media de su área (fijo: las tarifas no cambian)
+        above_mean = arrays['rate'][lo:hi] > area_avg_rates[arrays['area'][lo:hi]]
+        occupancy = arrays['occupancy'][lo:hi]
+        owner, ask_price, profits = arrays['owner'], arrays['ask_price'], arrays['profits']
+        area_of_origin = arrays['area_of_origin']
+
+        # Flujos aleatorios de los places de la banda y aristas que salen de ella
+        rng = StreamBank.from_keys(stream_keys(seed, np.arange(lo, hi)))
+        e_lo, e_hi = np.searchsorted(arrays['edge_src'], [lo, hi])
+        edge_src, edge_dst = arrays['edge_src'][e_lo:e_hi], arrays['edge_dst'][e_lo:e_hi]
+
+        while True:
+            command, args = conn.recv()
+            try:
+                if command == "occupancy":
+                    rng.counter, = args
+                    draws = rng.randint(0, 10)
+                    occupancy[:] = np.where(above_mean, 5 + draws, 10 + draws)
+                    reply = None
+                elif command == "bids":
+                    is_v1_active, = args
+                    # Igual que ArrayCity.make_bids: el comprador siempre tiene assets (es dueño de src)
+                    buyers = owner[edge_src]
+                    mask = profits[buyers] > 0
+                    mask &= owner[edge_dst] != buyers
+                    mask &= profits[buyers] >= ask_price[edge_dst]
+                    if is_v1_active:
+                        # Lógica V1: el host solo puede comprar en su área de origen
+                        mask &= arrays['area'][edge_dst] == area_of_origin[buyers]
+                    reply = np.unique(buyers[mask] * n_places + edge_dst[mask])
+                elif command == "stop":
+                    break
+                else:
+                    raise ValueError(f"Orden desconocida: {command}")
+            except Exception as error:  # el proceso principal la vuelve a lanzar
+                reply = error
+            conn.send(reply)
+    finally:
+        del arrays
+        for block in blocks:
+            block.close()
+
+
+def _shutdown(connections, processes, blocks):
+    """Para los procesos y libera la memoria compartida (usado por close y por weakref.finalize)."""
+    for conn in connections:
+        try:
+            conn.send(("stop", None))
+        except (BrokenPipeError, OSError):
+            pass
+    for process in processes:
+        process.join(timeout=5)
+        if process.is_alive():
+            process.terminate()
+    for block in blocks:
+        block.close()
+        block.unlink()
+
+
+class ShardedCity(ArrayCity):
+    """
+    ArrayCity con el trabajo de cada mes repartido en `n_workers` procesos (por defecto,
+    uno por CPU), cada uno responsable de una banda de filas de la grid.
+    """
+
+    def __init__(self, size, area_rates, seed=42, is_v1_active=False, price_history_limit=None, n_workers=None):
+        super().__init__(size, area_rates, seed, is_v1_active, price_history_limit)
+        self.n_workers = max(1, min(n_workers or os.cpu_count() or 1, size))
+        self.bands = []         # (lo, hi) de los place_id de cada proceso
+        self._area_avg_rates = None # tarifa media de cada área, calculada en initialize
+        self._connections = []
+        self._finalizer = None
+
+    # METODO 1
+    def initialize(self, rates=None):
+        """Inicializa como ArrayCity, pasa el estado a memoria compartida y arranca los procesos."""
+        super().initialize(rates)
+        self._area_avg_rates = super().get_area_avg_rates()
+
+        spec, blocks = {}, []
+        for name in SHARED_ARRAYS:
+            values = np.ascontiguousarray(getattr(self, name))
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            shared = np.ndarray(values.shape, dtype=values.dtype, buffer=block.buf)
+            shared[:] = values
+            setattr(self, name, shared)
+            blocks.append(block)
+            spec[name] = (block.name, values.dtype.str, values.shape)
+
+        # Bandas de filas lo más parecidas posible
+        row_limits = np.linspace(0, self.size, self.n_workers + 1).astype(np.int64)
+        self.bands = [(int(r0) * self.size, int(r1) * self.size) for r0, r1 in zip(row_limits, row_limits[1:])]
+
+        processes = []
+        for lo, hi in self.bands:
+            parent, child = mp.Pipe()
+            process = mp.Process(target=_worker, args=(child, spec, self.seed, self._area_avg_rates, lo, hi), daemon=True)
+            process.start()
+            child.close()
+            self._connections.append(parent)
+            processes.append(process)
+
+        # Se liberan los recursos aunque no se llame a close()
+        self._finalizer = weakref.finalize(self, _shutdown, self._connections, processes, blocks)
+
+    def close(self):
+        """Para los procesos y libera la memoria compartida (los arrays pasan a ser copias locales)."""
+        if self._finalizer is None or not self._finalizer.alive:
+            return
+        for name in SHARED_ARRAYS:
+            setattr(self, name, np.array(getattr(self, name)))
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _broadcast(self, command, args=None):
+        """Envía una orden a todos los procesos y devuelve sus respuestas (en orden de banda)."""
+        for conn in self._connections:
+            conn.send((command, args))
+        replies = [conn.recv() for conn in self._connections]
+        for reply in replies:
+            if isinstance(reply, Exception):
+                raise reply
+        return replies
+
+    # METODO AUXILIAR
+    def get_area_avg_rates(self):
+        """Tarifa media de cada área, calculada una vez en initialize (las tarifas no cambian)."""
+        if self._area_avg_rates is None:
+            return super().get_area_avg_rates()
+        return self._area_avg_rates.copy()
+
+    # METODO AUXILIAR
+    def update_occupancy(self):
+        """Cada proceso sortea la ocupación de su banda con el contador de sorteos de este mes."""
+        self._broadcast("occupancy", (self.rng.counter,))
+        self.rng.counter += 1
+
+    # METODO AUXILIAR
+    def make_bids(self):
+        """Junta las ofertas de todas las bandas, sin duplicados y en el mismo orden que ArrayCity."""
+        keys = np.unique(np.concatenate(self._broadcast("bids", (self.is_v1_active,))))
+        buyers = keys // self.n_places
+        targets = keys % self.n_places
+
+        budgets = self.profits[buyers]
+        return targets, self.owner[targets], buyers, budgets - self.ask_price[targets], budgets
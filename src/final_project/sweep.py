@@ -0,0 +1,192 @@
+# src/final_project/sweep.py
+"""
+Ejecución de muchos escenarios (V0/V1, seeds, tamaños de grid, tarifas) en paralelo.
+
+Cada escenario es un diccionario de configuración:
+    {'seed': 42, 'grid_size': 10, 'area_rates': {...}, 'is_v1_active': False,
+     'steps': 180, 'engine': 'object', 'listings': None, 'results': None}
+
+Como cada ciudad usa sus propios generadores aleatorios (ver rng.py), el resultado de un
+escenario solo depende de su configuración: da igual cuántos procesos se usen o en qué
+orden terminen.
+"""
+
+import hashlib
+import json
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+
+import numpy as np
+import pandas as pd
+
+from .array_city import ArrayCity
+from .city import City
+from .listings import file_hash, load_listings, sample_rates
+from .metrics import ArraySink, AveragePriceCollector, WealthCollector
+from .profiling import PhaseProfiler
+from .results import CONCENTRATION_COLUMNS, TRANSACTION_COLUMNS, ResultsStore, TransactionLogger, step_columns
+from .sharded_city import ShardedCity
+
+ENGINES = {"object": City, "array": ArrayCity, "sharded": ShardedCity}
+
+DEFAULT_CONFIG = {
+    'seed': 42,
+    'grid_size': 10,
+    'area_rates': {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)},
+    'is_v1_active': False,
+    'steps': 180,
+    'engine': 'object',
+    'profile': False,  # True -> el resultado incluye las filas de PhaseProfiler (ver profiling.py)
+    'listings': None,  # listings.csv.gz del que sortear las tarifas iniciales (None = area_rates)
+    'rates': None,     # tarifas iniciales ya sorteadas, una por place (run_sweep las saca de 'listings')
+    'fast_forward': True,  # avanzar de golpe los meses con el mercado parado (mismo resultado, ver quiescence.py)
+    'results': None,   # carpeta de un ResultsStore donde guardar las tablas del escenario (ver results.py)
+    'scenario': None,  # nombre del escenario en el ResultsStore (None = scenario_name(config))
+}
+
+
+def make_configs(seeds=(42,), grid_sizes=(10,), area_rates_options=None, v1_options=(False, True), **common):
+    """
+    Devuelve la lista de configuraciones del producto cartesiano de los parámetros.
+    `common` sobrescribe el resto de claves de DEFAULT_CONFIG (por ejemplo steps o engine).
+    """
+    if area_rates_options is None:
+        area_rates_options = [DEFAULT_CONFIG['area_rates']]
+
+    configs = []
+    for seed, grid_size, area_rates, is_v1_active in product(seeds, grid_sizes, area_rates_options, v1_options):
+        config = dict(DEFAULT_CONFIG, **common)
+        config.update(seed=seed, grid_size=grid_size, area_rates=area_rates, is_v1_active=is_v1_active)
+        configs.append(config)
+    return configs
+
+
+# Claves que no cambian los resultados de un escenario (o que ya forman parte de la partición)
+_NAME_EXCLUDED_KEYS = ('seed', 'profile', 'fast_forward', 'results', 'scenario')
+
+
+def scenario_name(config):
+    """
+    Nombre por defecto de un escenario en el ResultsStore, por ejemplo "v0-grid10-object-1a2b3c4d".
+    El sufijo es un hash estable del resto de la configuración (tarifas, steps, listings...),
+    así dos escenarios distintos nunca comparten partición. Del fichero de listings cuenta su
+    contenido, no su ruta: si el fichero cambia, cambia el nombre.
+    """
+    config = dict(DEFAULT_CONFIG, **config)
+    relevant = {key: value for key, value in config.items() if key not in _NAME_EXCLUDED_KEYS}
+    if config['listings']:
+        # Con listings, las tarifas ya quedan determinadas por el fichero, la seed y el tamaño
+        relevant['listings'] = file_hash(config['listings'])
+        relevant['rates'] = None
+    elif config['rates'] is None:
+        relevant['rates'] = None
+    else:
+        relevant['rates'] = hashlib.sha256(np.asarray(config['rates'], dtype=np.int64).tobytes()).hexdigest()
+    digest = hashlib.sha256(json.dumps(relevant, sort_keys=True, default=str).encode()).hexdigest()[:8]
+    return f"v{int(config['is_v1_active'])}-grid{config['grid_size']}-{config['engine']}-{digest}"
+
+
+def prepare_rates(configs):
+    """
+    Sortea las tarifas iniciales de las configuraciones con 'listings' y sin 'rates'.
+    Cada fichero se carga una sola vez (en este proceso), y los procesos del sweep reciben
+    directamente las tarifas.
+    """
+    listings, prepared = {}, []
+    for config in configs:
+        config = dict(DEFAULT_CONFIG, **config)
+        if config['listings'] and config['rates'] is None:
+            if config['listings'] not in listings:
+                listings[config['listings']] = load_listings(config['listings'], columns=('host_id', 'price'))['price']
+            config['rates'] = sample_rates(listings[config['listings']], config['grid_size'] ** 2, config['seed'])
+        prepared.append(config)
+    return prepared
+
+
+def prepare_results(configs):
+    """
+    Completa el nombre de escenario de las configuraciones con 'results' y borra sus
+    particiones anteriores (una sola vez, antes de repartir los escenarios entre procesos).
+    Lanza ValueError si dos configuraciones escribirían en la misma partición.
+    """
+    prepared, seen = [], set()
+    for config in configs:
+        config = dict(DEFAULT_CONFIG, **config)
+        if config['results']:
+            config['scenario'] = config['scenario'] or scenario_name(config)
+            partition = (config['results'], config['scenario'], config['seed'])
+            if partition in seen:
+                raise ValueError(f"Dos escenarios escriben en la misma partición de resultados: {partition}")
+            seen.add(partition)
+            ResultsStore(config['results']).clear(config['scenario'], config['seed'])
+        prepared.append(config)
+    return prepared
+
+
+def run_scenario(config, clear_results=True, city=None):
+    """
+    Simula un escenario y devuelve un dict con la configuración, el historial del
+    precio medio de venta (uno por mes) y la tabla de riqueza final de los hosts.
+    Con config['results'], además guarda las tablas del escenario en ese ResultsStore
+    (sustituyendo las de una ejecución anterior, salvo con clear_results=False).
+    `city` (opcional): ciudad ya creada, sin inicializar, que se usa en vez de crear una
+    nueva con config (así se puede consultar después de la simulación).
+    """
+    if clear_results:
+        config, = prepare_results([config])
+    config = dict(DEFAULT_CONFIG, **config)
+    if city is None:
+        city = ENGINES[config['engine']](config['grid_size'], config['area_rates'], config['seed'],
+                                         is_v1_active=config['is_v1_active'])
+    n_cols = 2 + len(config['area_rates'])
+    prices = city.add_observer(AveragePriceCollector(ArraySink(config['steps'], n_cols)))
+
+    store, sinks = None, []
+    if config['results']:
+        store = ResultsStore(config['results'])
+        scenario = config['scenario'] or scenario_name(config)
+        sinks = [store.sink('steps', scenario, config['seed'], step_columns(len(config['area_rates']))),
+                 store.sink('concentration', scenario, config['seed'], CONCENTRATION_COLUMNS),
+                 store.sink('transactions', scenario, config['seed'], TRANSACTION_COLUMNS)]
+        city.add_observer(AveragePriceCollector(sinks[0]))
+        city.add_observer(TransactionLogger(sinks[2]))
+    wealth = city.add_observer(WealthCollector(sinks[1] if sinks else None))
+    if config['profile']:
+        city.profiler = PhaseProfiler()
+
+    if config['rates'] is None:
+        config, = prepare_rates([config])
+    city.initialize(config['rates'])
+
+    try:
+        city.advance(config['steps'], fast_forward=config['fast_forward'])
+    finally:
+        if hasattr(city, 'close'): # ShardedCity: para sus procesos y libera la memoria compartida
+            city.close()
+
+    for sink in sinks:
+        sink.close()
+    if store is not None:
+        store.write_part('wealth', scenario, config['seed'], pd.DataFrame(wealth.to_dict()))
+
+    wealth_table = {key: values.tolist() for key, values in wealth.to_dict().items()}
+    result = {'config': config, 'avg_price_history': prices.history(), 'wealth': wealth_table}
+    if city.profiler is not None:
+        result['profile'] = city.profiler.records
+    return result
+
+
+def run_sweep(configs, max_workers=None):
+    """
+    Ejecuta todos los escenarios en un pool de procesos y devuelve sus resultados
+    en el mismo orden que `configs`. Con max_workers=1 se ejecutan en este proceso.
+    """
+    # Las tarifas de listings y las particiones de resultados se preparan aquí, no en cada proceso
+    configs = prepare_results(prepare_rates(configs))
+    run = partial(run_scenario, clear_results=False)
+    if max_workers == 1 or len(configs) <= 1:
+        return [run(config) for config in configs]
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(run, configs))
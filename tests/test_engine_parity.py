@@ -0,0 +1,138 @@
+# tests/test_engine_parity.py
+"""
+Equivalencias exactas de la simulación con la misma seed:
+    - City (objetos) y ArrayCity (arrays): mismo precio medio cada mes, mismas ventas y misma
+      riqueza final (ver benchmarks/compare_engines.py para más seeds y tamaños).
+    - advance con y sin fast_forward (ver quiescence.py).
+    - Una ciudad restaurada de un snapshot y la original (ver checkpoint.py).
+    - ShardedCity, con cualquier nº de procesos, y ArrayCity.
+    - Cada réplica de run_replicas y ArrayCity con la seed de esa réplica (ver replicas.py).
+"""
+
+import numpy as np
+import pytest
+
+from src.final_project.array_city import ArrayCity
+from src.final_project.checkpoint import load_snapshot, save_snapshot
+from src.final_project.city import City
+from src.final_project.metrics import AveragePriceCollector, Observer, WealthCollector
+from src.final_project.replicas import run_replicas
+from src.final_project.sharded_city import ShardedCity
+
+AREA_RATES = {0: (100, 200), 1: (50, 250), 2: (250, 350), 3: (150, 450)}
+SIZE = 10
+STEPS = 180
+
+
+class TransactionRecorder(Observer):
+    """Guarda (step, place_id, buyer_id, seller_id, bid_price) de cada venta."""
+
+    def __init__(self):
+        self.transactions = []
+
+    def on_transaction(self, city, tx, previous_price):
+        self.transactions.append((city.step, int(tx['place_id']), int(tx['buyer_id']),
+                                  int(tx['seller_id']), float(tx['bid_price'])))
+
+
+def simulate(engine, seed, is_v1_active, **options):
+    """Historial de precio medio, ventas y riqueza final de una simulación."""
+    city = engine(SIZE, AREA_RATES, seed, is_v1_active=is_v1_active, **options)
+    prices = city.add_observer(AveragePriceCollector())
+    recorder = city.add_observer(TransactionRecorder())
+    city.initialize()
+    for _ in range(STEPS):
+        city.iterate()
+    wealth = np.asarray(city.get_host_wealth()['wealth'], dtype=np.float64)
+    if hasattr(city, 'close'):
+        city.close() # ShardedCity: para los procesos
+    return prices.history(), recorder.transactions, wealth
+
+
+@pytest.mark.parametrize("is_v1_active", [False, True], ids=["v0", "v1"])
+@pytest.mark.parametrize("seed", [0, 1, 42])
+def test_city_and_array_city_are_identical(seed, is_v1_active):
+    object_history, object_transactions, object_wealth = simulate(City, seed, is_v1_active)
+    array_history, array_transactions, array_wealth = simulate(ArrayCity, seed, is_v1_active)
+
+    assert object_transactions, "la simulación debería tener alguna venta"
+    assert object_history == array_history
+    assert object_transactions == array_transactions
+    np.testing.assert_array_equal(object_wealth, array_wealth)
+
+
+@pytest.mark.parametrize("is_v1_active", [False, True], ids=["v0", "v1"])
+@pytest.mark.parametrize("engine", [City, ArrayCity], ids=["object", "array"])
+def test_fast_forward_matches_month_by_month(engine, is_v1_active):
+    # 600 meses: el mercado se para varias veces y advance salta esos tramos de golpe
+    runs = []
+    for fast_forward in (False, True):
+        city = engine(SIZE, AREA_RATES, 42, is_v1_active=is_v1_active)
+        prices = city.add_observer(AveragePriceCollector())
+        wealth = city.add_observer(WealthCollector(gini_every=12))
+        city.initialize()
+        city.advance(600, fast_forward=fast_forward)
+        runs.append((city.step, prices.history(), [list(row) for row in prices.sink.rows],
+                     np.array(wealth.sink.rows), wealth.to_dict()['wealth'],
+                     np.asarray(city.get_host_wealth()['wealth'], dtype=np.float64)))
+
+    (steps, history, price_rows, wealth_rows, collected, final), \
+        (ff_steps, ff_history, ff_price_rows, ff_wealth_rows, ff_collected, ff_final) = runs
+    assert steps == ff_steps == 600
+    assert history == ff_history
+    assert price_rows == ff_price_rows
+    np.testing.assert_array_equal(wealth_rows, ff_wealth_rows)
+    np.testing.assert_array_equal(collected, ff_collected)
+    np.testing.assert_array_equal(final, ff_final)
+
+
+@pytest.mark.parametrize("is_v1_active", [None, True], ids=["same", "override"])
+@pytest.mark.parametrize("engine", [City, ArrayCity], ids=["object", "array"])
+def test_snapshot_continues_like_the_original(engine, is_v1_active, tmp_path):
+    original = engine(SIZE, AREA_RATES, 42)
+    original.initialize()
+    for _ in range(90):
+        original.iterate()
+    save_snapshot(original, tmp_path / "city.snap")
+    restored = load_snapshot(tmp_path / "city.snap", is_v1_active=is_v1_active)
+    assert type(restored) is engine and restored.step == 90
+    if is_v1_active is not None:
+        original.is_v1_active = is_v1_active # la original cambia de regla en el mismo mes
+
+    runs = []
+    for city in (original, restored):
+        prices = city.add_observer(AveragePriceCollector())
+        recorder = city.add_observer(TransactionRecorder())
+        for _ in range(90):
+            city.iterate()
+        runs.append((prices.history(), recorder.transactions,
+                     np.asarray(city.get_host_wealth()['wealth'], dtype=np.float64)))
+
+    (history, transactions, wealth), (restored_history, restored_transactions, restored_wealth) = runs
+    assert transactions, "la simulación debería tener alguna venta después del snapshot"
+    assert history == restored_history
+    assert transactions == restored_transactions
+    np.testing.assert_array_equal(wealth, restored_wealth)
+
+
+@pytest.mark.parametrize("is_v1_active", [False, True], ids=["v0", "v1"])
+@pytest.mark.parametrize("n_workers", [1, 3])
+def test_sharded_city_matches_array_city(n_workers, is_v1_active):
+    array_history, array_transactions, array_wealth = simulate(ArrayCity, 42, is_v1_active)
+    sharded_history, sharded_transactions, sharded_wealth = simulate(ShardedCity, 42, is_v1_active,
+                                                                     n_workers=n_workers)
+
+    assert array_history == sharded_history
+    assert array_transactions == sharded_transactions
+    np.testing.assert_array_equal(array_wealth, sharded_wealth)
+
+
+@pytest.mark.parametrize("is_v1_active", [False, True], ids=["v0", "v1"])
+def test_each_replica_matches_array_city(is_v1_active):
+    seeds = [0, 1, 42]
+    result = run_replicas(SIZE, AREA_RATES, STEPS, is_v1_active=is_v1_active, seeds=seeds)
+
+    for r, seed in enumerate(seeds):
+        history, _, wealth = simulate(ArrayCity, seed, is_v1_active)
+        assert result['avg_price'][r].tolist() == history
+        np.testing.assert_array_equal(result['wealth'][r], wealth)